@@ -0,0 +1,156 @@
+# Shared, read-only arena with the prepared history of every asset: the
+# OHLCV columns plus the date features and indicators load_data() derives.
+# It is one memory-mapped file, so any number of worker processes attach to
+# the same physical pages instead of each holding its own pandas copy.
+#
+# Layout: store/arena/<version>/values.npy  float64 [field, row]
+#         store/arena/<version>/dates.npy   datetime64[D] [row]
+#         store/arena/<version>/index.json  fields + row range and store version per asset
+#         store/arena/CURRENT
+#
+# Refresh after changing the price store with: python arena.py [--full]
+# Assets whose store is unchanged are copied over, assets that only had
+# candles appended (see ingest.py) get just the new rows computed, and the
+# rest are rebuilt from load_data(). --full rebuilds everything.
+import json
+import os
+import shutil
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+
+from assets import ASSETS
+from price_store import STORE_DIR, current_version as store_version, read_columns, read_meta
+from predictor import load_data, ema_state, extend_features
+
+ARENA_DIR = os.path.join(STORE_DIR, 'arena')
+
+FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume', 'Day ', 'Month ', 'Year ',
+          'Return', 'Lag_1', 'Lag_2', 'Lag_3', 'SMA_20', 'SMA_50',
+          'SMA_diff', 'RSI', 'MACD', 'EMA_12', 'EMA_26']
+
+KEEP_VERSIONS = 2
+
+class AssetColumns(dict):
+    """Column name -> read-only array view into the arena for one asset."""
+
+    def __len__(self):
+        return len(self['Date'])
+
+class Arena:
+    def __init__(self, version):
+        directory = os.path.join(ARENA_DIR, version)
+        self.version = version
+        self.values = np.load(os.path.join(directory, 'values.npy'), mmap_mode='r')
+        self.dates = np.load(os.path.join(directory, 'dates.npy'), mmap_mode='r')
+        with open(os.path.join(directory, 'index.json')) as f:
+            index = json.load(f)
+        self.fields = index['fields']
+        self.assets = index['assets']
+
+    def columns(self, asset_id):
+        entry = self.assets[asset_id]
+        rows = slice(entry['start'], entry['stop'])
+        columns = AssetColumns(Date=self.dates[rows])
+        for i, name in enumerate(self.fields):
+            if name in entry['fields']:
+                columns[name] = self.values[i, rows]
+        return columns
+
+def current_arena_version():
+    try:
+        with open(os.path.join(ARENA_DIR, 'CURRENT')) as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+_attached = None
+
+def attach_arena():
+    # One mapping per process, replaced when CURRENT moves to a new build
+    global _attached
+    version = current_arena_version()
+    if version is None:
+        return None
+    if _attached is None or _attached.version != version:
+        _attached = Arena(version)
+    return _attached
+
+def load_history(asset_id):
+    # Arena columns when the arena was built from the current price store,
+    # otherwise a private DataFrame from load_data()
+    arena = attach_arena()
+    if arena is not None and asset_id in arena.assets:
+        if arena.assets[asset_id]['store_version'] == store_version(asset_id):
+            return arena.columns(asset_id)
+    return load_data(asset_id)
+
+def asset_block(asset_id, arena=None):
+    # (columns, entry) for one asset, doing as little work as the store allows
+    version = store_version(asset_id)
+    entry = arena.assets.get(asset_id) if arena is not None else None
+    if entry is not None and 'state' in entry:
+        if entry['store_version'] == version:
+            return arena.columns(asset_id), entry
+        meta = read_meta(asset_id, version)
+        if meta.get('base_version') == entry['store_version']:
+            old = arena.columns(asset_id)
+            new, state = extend_features(asset_id, read_columns(asset_id, version), meta['appended'], entry['state'])
+            columns = AssetColumns({name: np.concatenate([old[name], new[name]]) for name in old})
+            return columns, dict(entry, store_version=version, state=state)
+
+    df = load_data(asset_id)
+    if df is None:
+        return None, None
+    fields = [name for name in FIELDS if name in df.columns]
+    columns = AssetColumns({name: df[name].to_numpy() for name in ['Date'] + fields})
+    entry = {
+        'fields': fields,
+        'store_version': version,
+        'state': ema_state(read_columns(asset_id, version)['Close']),
+    }
+    return columns, entry
+
+def build_arena(asset_ids=None, full=False):
+    arena = None if full else attach_arena()
+    asset_ids = list(asset_ids or ASSETS)
+    blocks, entries, start = [], {}, 0
+    for asset_id in asset_ids:
+        columns, entry = asset_block(asset_id, arena)
+        if columns is None:
+            print(f"Skipping {asset_id}: no data")
+            continue
+        blocks.append(columns)
+        entries[asset_id] = dict(entry, start=start, stop=start + len(columns))
+        start += len(columns)
+
+    values = np.full((len(FIELDS), start), np.nan)
+    dates = np.empty(start, dtype='datetime64[D]')
+    for columns, entry in zip(blocks, entries.values()):
+        rows = slice(entry['start'], entry['stop'])
+        dates[rows] = np.asarray(columns['Date']).astype('datetime64[D]')
+        for name in entry['fields']:
+            values[FIELDS.index(name), rows] = np.asarray(columns[name], dtype='float64')
+
+    version = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')
+    directory = os.path.join(ARENA_DIR, version)
+    os.makedirs(directory)
+    np.save(os.path.join(directory, 'values.npy'), values)
+    np.save(os.path.join(directory, 'dates.npy'), dates)
+    with open(os.path.join(directory, 'index.json'), 'w') as f:
+        json.dump({'fields': FIELDS, 'assets': entries}, f, indent=2)
+
+    tmp = os.path.join(ARENA_DIR, f"CURRENT.tmp-{os.getpid()}")
+    with open(tmp, 'w') as f:
+        f.write(version)
+    os.replace(tmp, os.path.join(ARENA_DIR, 'CURRENT'))
+
+    builds = sorted(name for name in os.listdir(ARENA_DIR) if os.path.isdir(os.path.join(ARENA_DIR, name)))
+    for name in builds[:-KEEP_VERSIONS]:
+        shutil.rmtree(os.path.join(ARENA_DIR, name), ignore_errors=True)
+    print(f"Arena {version}: {start} rows for {', '.join(entries)}")
+    return version
+
+if __name__ == '__main__':
+    build_arena(full='--full' in sys.argv[1:])
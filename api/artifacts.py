@@ -0,0 +1,57 @@
+import json
+import os
+from datetime import datetime, timezone
+
+from assets import BASE_DIR
+from boosters import load_booster, save_booster
+
+# Versioned model artifacts: models/<name>/<version>.ubj (native XGBoost format)
+# plus a <version>.json metadata file, with models/<name>/LATEST naming the
+# version to serve
+MODELS_DIR = os.path.join(BASE_DIR, 'models')
+
+def artifact_dir(name):
+    return os.path.join(MODELS_DIR, name)
+
+def new_version():
+    return datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')
+
+def write_atomic(path, data):
+    # Readers never see a half-written file
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def save_artifact(name, model, metadata=None):
+    version = new_version()
+    directory = artifact_dir(name)
+    os.makedirs(directory, exist_ok=True)
+
+    metadata = dict(metadata or {})
+    metadata.update({'name': name, 'version': version})
+    model_path = os.path.join(directory, f"{version}.ubj")
+    tmp = f"{model_path}.tmp-{os.getpid()}.ubj"
+    save_booster(model, tmp)
+    os.replace(tmp, model_path)
+    write_atomic(os.path.join(directory, f"{version}.json"), json.dumps(metadata, indent=2).encode('utf-8'))
+    # Publish last, once the artifact itself is complete
+    write_atomic(os.path.join(directory, 'LATEST'), version.encode('utf-8'))
+    return version
+
+def latest_version(name):
+    try:
+        with open(os.path.join(artifact_dir(name), 'LATEST')) as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+def load_artifact(name, version=None):
+    version = version or latest_version(name)
+    if version is None:
+        raise FileNotFoundError(f"No trained artifact for '{name}' in {MODELS_DIR}")
+    directory = artifact_dir(name)
+    model = load_booster(os.path.join(directory, f"{version}.ubj"))
+    with open(os.path.join(directory, f"{version}.json")) as f:
+        metadata = json.load(f)
+    return model, metadata
@@ -0,0 +1,23 @@
+# Async entry point: uvicorn asgi:app --app-dir api --port 5480
+# (or python asgi.py). The same Flask app as wsgi.py, served by one process
+# through asgi_bridge.py, so bulk backfills and admin reloads run in
+# bounded pools while cached forecasts are answered on the event loop.
+from asgi_bridge import AsgiBridge
+from server import DEFAULT_PORT, create_app
+
+API_ROUTES = {
+    # Served from the forecast cache; a miss costs a single model.predict
+    'predict': {'lane': 'loop'},
+    'assets': {'lane': 'loop'},
+    'history': {'lane': 'cpu', 'limit': 4, 'queue': 32},
+    'predict_bulk': {'lane': 'cpu', 'limit': 2, 'queue': 8},
+    'metrics': {'lane': 'io', 'limit': 2, 'queue': 8},
+    'admin_reload': {'lane': 'io', 'limit': 1, 'queue': 2},
+}
+
+flask_app = create_app()
+app = AsgiBridge(flask_app, API_ROUTES, on_startup=flask_app.config['FORECAST_CACHE'].start_watcher)
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(app, host='0.0.0.0', port=DEFAULT_PORT)
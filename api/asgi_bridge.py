@@ -0,0 +1,200 @@
+# Serves a Flask app over ASGI (uvicorn) so that slow requests don't hold
+# up fast ones.
+#
+# Each request is matched to its Flask endpoint and run in the lane the
+# route table gives it:
+#   loop - directly on the event loop; only for handlers that never block,
+#          such as answers from a cache
+#   cpu  - in a thread pool of API_CPU_WORKERS threads (default: CPU count)
+#          for forecasting work; XGBoost and NumPy release the GIL
+#   io   - in a thread pool of API_IO_WORKERS threads (default 16) for
+#          handlers that wait on the network or the disk
+# Pool routes also get a concurrency limit: at most `limit` requests run at
+# once, `queue` more wait, and the rest are turned away with a 503 at once
+# instead of piling up behind the slow ones.
+import asyncio
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.exceptions import HTTPException
+
+CPU_WORKERS = int(os.environ.get('API_CPU_WORKERS', os.cpu_count() or 1))
+IO_WORKERS = int(os.environ.get('API_IO_WORKERS', 16))
+
+# For endpoints missing from the route table
+DEFAULT_ROUTE = {'lane': 'io', 'limit': IO_WORKERS, 'queue': 100}
+# Answer to requests over a route's limit and queue
+BUSY = (503, [('Content-Type', 'application/json'), ('Retry-After', '1')],
+        b'{"error":"Server busy, try again","success":false}\n')
+
+def wsgi_environ(scope, body):
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_PROTOCOL': f"HTTP/{scope['http_version']}",
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    server = scope.get('server') or ('localhost', 80)
+    environ['SERVER_NAME'], environ['SERVER_PORT'] = server[0], str(server[1])
+    if scope.get('client'):
+        environ['REMOTE_ADDR'], environ['REMOTE_PORT'] = scope['client'][0], str(scope['client'][1])
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ[name] = value
+        elif name != 'CONTENT_LENGTH':
+            key = f"HTTP_{name}"
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+def start_wsgi(app, environ):
+    # Calls the app -> (status code, headers, body iterable); the body is
+    # consumed by send_body, so streamed responses stay streamed
+    started = {}
+    written = []
+
+    def start_response(status, headers, exc_info=None):
+        started['status'] = int(status.split(' ', 1)[0])
+        started['headers'] = headers
+        return written.append
+
+    result = app(environ, start_response)
+    if written:
+        result = ClosingChain(written, result)
+    return started['status'], started['headers'], result
+
+class ClosingChain:
+    # Data given to write() followed by the returned iterable
+    def __init__(self, written, result):
+        self.written = written
+        self.result = result
+
+    def __iter__(self):
+        yield from self.written
+        yield from self.result
+
+    def close(self):
+        if hasattr(self.result, 'close'):
+            self.result.close()
+
+class RouteLimit:
+    def __init__(self, limit, queue):
+        self.slots = asyncio.Semaphore(limit)
+        self.capacity = limit + queue
+        self.pending = 0
+
+class AsgiBridge:
+    """ASGI app running a Flask app's routes in their lanes (see above).
+
+    routes: {endpoint: {'lane': 'loop'|'cpu'|'io', 'limit': n, 'queue': n}}
+    on_startup: called once the server is up, e.g. to start watcher threads
+    """
+
+    def __init__(self, app, routes=None, on_startup=None):
+        self.app = app
+        self.routes = routes or {}
+        self.on_startup = on_startup
+        self.pools = {
+            'cpu': ThreadPoolExecutor(CPU_WORKERS, thread_name_prefix='asgi-cpu'),
+            'io': ThreadPoolExecutor(IO_WORKERS, thread_name_prefix='asgi-io'),
+        }
+        self.limits = {}
+
+    def route(self, environ):
+        try:
+            endpoint, _ = self.app.url_map.bind_to_environ(environ).match()
+        except HTTPException:
+            # Not found, wrong method or a redirect: Flask answers it right away
+            return None, {'lane': 'loop'}
+        return endpoint, dict(DEFAULT_ROUTE, **self.routes.get(endpoint, {}))
+
+    def limit(self, endpoint, route):
+        if endpoint not in self.limits:
+            self.limits[endpoint] = RouteLimit(route['limit'], route['queue'])
+        return self.limits[endpoint]
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] != 'http':
+            return
+
+        body = b''
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+
+        environ = wsgi_environ(scope, body)
+        endpoint, route = self.route(environ)
+        if route['lane'] == 'loop':
+            await self.respond(send, *start_wsgi(self.app, environ))
+            return
+
+        limit = self.limit(endpoint, route)
+        if limit.pending >= limit.capacity:
+            status, headers, body = BUSY
+            await self.respond(send, status, headers, [body])
+            return
+        limit.pending += 1
+        try:
+            # The slot is held until the last chunk is sent
+            async with limit.slots:
+                pool = self.pools[route['lane']]
+                loop = asyncio.get_running_loop()
+                response = await loop.run_in_executor(pool, start_wsgi, self.app, environ)
+                await self.respond(send, *response, pool=pool)
+        finally:
+            limit.pending -= 1
+
+    async def respond(self, send, status, headers, result, pool=None):
+        # Sends the body one chunk at a time; the chunks of pool routes are
+        # produced in their pool, the others on the loop
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+        })
+        loop = asyncio.get_running_loop()
+        chunks = iter(result)
+        try:
+            while True:
+                if pool is None:
+                    chunk = next(chunks, None)
+                else:
+                    chunk = await loop.run_in_executor(pool, next, chunks, None)
+                if chunk is None:
+                    break
+                if chunk:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        finally:
+            # Runs Flask's teardown for the request
+            if hasattr(result, 'close'):
+                result.close()
+        await send({'type': 'http.response.body', 'body': b''})
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                if self.on_startup is not None:
+                    self.on_startup()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                for pool in self.pools.values():
+                    pool.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
@@ -0,0 +1,111 @@
+import os
+
+# All paths in the registry are relative to the api/ directory, so the
+# services work whether they are started from the repo root or from api/.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Match EXACT feature names from training (including spaces)
+DATE_FEATURES = ['Day ', 'Month ', 'Year ']
+
+# Registry of every asset served by the prediction API.
+# The key is the id used by the React frontend (App.jsx).
+ASSETS = {
+    'bitcoin': {
+        'symbol': 'BTC',
+        'ticker': 'BTC-USD',
+        'model': 'btc_model.ubj',
+        'data': 'bitcoin_formatted.csv',
+        'features': DATE_FEATURES,
+        'indicators': [],
+        'port': 5474,
+    },
+    'ethereum': {
+        'symbol': 'ETH',
+        'ticker': 'ETH-USD',
+        'model': 'eth_model.ubj',
+        'data': 'eth_formatted.csv',
+        'features': DATE_FEATURES,
+        'indicators': [],
+        'port': 5475,
+    },
+    'solana': {
+        'symbol': 'SOL',
+        'ticker': 'SOL-USD',
+        'model': 'solana_model.ubj',
+        'data': 'solana_formatted.csv',
+        'features': DATE_FEATURES,
+        'indicators': [],
+        'port': 5472,
+    },
+    'doge': {
+        'symbol': 'DOGE',
+        'ticker': 'DOGE-USD',
+        'model': 'doge_model.ubj',
+        'data': 'doge_5years_updated.csv',
+        'features': DATE_FEATURES,
+        'indicators': ['SMA_diff', 'RSI', 'MACD', 'EMA_12', 'EMA_26'],
+        'port': 5470,
+    },
+    'shiba': {
+        'symbol': 'SHIB',
+        'ticker': 'SHIB-USD',
+        'model': 'shiba_model.ubj',
+        'data': 'shiba_usd_2020_2025.csv',
+        'features': DATE_FEATURES,
+        'indicators': [],
+        'port': 5471,
+    },
+    'tone': {
+        'symbol': 'TON',
+        'ticker': 'TON-USD',
+        'model': 'tone_model.ubj',
+        'data': 'tone_formatted.csv',
+        'features': DATE_FEATURES,
+        'indicators': [],
+        'port': 5473,
+    },
+    'usdt': {
+        'symbol': 'USDT',
+        'ticker': 'USDT-USD',
+        'model': 'usdt_model.ubj',
+        'data': 'usdt_formatted.csv',
+        'features': DATE_FEATURES,
+        'indicators': [],
+        'port': 5476,
+    },
+    'xrp': {
+        'symbol': 'XRP',
+        'ticker': 'XRP-USD',
+        'model': 'xrp_model.ubj',
+        'data': 'xrp_formatted.csv',
+        'features': DATE_FEATURES,
+        'indicators': [],
+        'port': 5477,
+    },
+    'bnb': {
+        'symbol': 'BNB',
+        'ticker': 'BNB-USD',
+        'model': 'bnb_model.ubj',
+        'data': 'bnb_5years.csv',
+        'features': DATE_FEATURES,
+        'indicators': [],
+        'port': 5478,
+    },
+}
+
+
+def asset_path(name):
+    return os.path.join(BASE_DIR, name)
+
+
+def resolve_asset(key):
+    # Accept the frontend id ('bitcoin'), the symbol ('BTC') or the ticker ('BTC-USD')
+    if key is None:
+        return None
+    key = str(key).strip()
+    if key.lower() in ASSETS:
+        return key.lower()
+    for asset_id, spec in ASSETS.items():
+        if key.upper() in (spec['symbol'], spec['ticker']):
+            return asset_id
+    return None
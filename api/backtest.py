@@ -0,0 +1,154 @@
+# Walk-forward backtest of the date models, per asset and per horizon.
+#
+#   python backtest.py [--variant NAME] [--folds N] [--step DAYS] [--workers N] [asset ...]
+#
+# Every fold trains on the history up to an origin row only and forecasts
+# the next max(HORIZONS) days, so no future prices leak into training
+# (unlike the random split in train.py/binance.py). Origins are STEP rows
+# apart and end HORIZON rows before the last candle. Folds of all assets
+# run in parallel processes; MAPE and RMSE over each horizon's forecast path
+# are printed per asset and saved to backtests/<run>.json.
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from xgboost import XGBRegressor
+
+from assets import ASSETS, BASE_DIR
+from artifacts import new_version, write_atomic
+from predictor import TIMEFRAME_MAP, date_features
+from price_store import current_version, read_columns
+from train import TRAIN_PARAMS
+
+HORIZONS = sorted(set(TIMEFRAME_MAP.values()))
+N_FOLDS = 12
+FOLD_STEP = 30
+# Origins with less history than this are skipped
+MIN_TRAIN_ROWS = 365
+
+CACHE_DIR = os.path.join(BASE_DIR, 'cache', 'backtest')
+RESULTS_DIR = os.path.join(BASE_DIR, 'backtests')
+
+# Model variants to compare; each maps (X_train, y_train, X_future, n_jobs) to predictions
+def xgb_date(X_train, y_train, X_future, n_jobs):
+    model = XGBRegressor(**TRAIN_PARAMS, n_jobs=n_jobs)
+    model.fit(X_train, y_train)
+    return model.predict(X_future)
+
+def naive(X_train, y_train, X_future, n_jobs):
+    # Last known close carried forward
+    return np.full(len(X_future), y_train[-1])
+
+VARIANTS = {
+    'xgb_date': xgb_date,
+    'naive': naive,
+}
+
+def fold_dataset(asset_id, n_folds=N_FOLDS, step=FOLD_STEP):
+    # Feature matrix, target and fold origins, cached per store version;
+    # each fold is a prefix/slice of the same arrays
+    path = os.path.join(CACHE_DIR, f"{asset_id}-{current_version(asset_id)}-{n_folds}x{step}.npz")
+    if os.path.exists(path):
+        with np.load(path) as data:
+            return data['X'], data['y'], data['origins']
+
+    columns = read_columns(asset_id)
+    X = date_features(columns['Date']).to_numpy(dtype='float64')
+    y = np.asarray(columns['Close'], dtype='float64')
+    last_origin = len(y) - 1 - max(HORIZONS)
+    origins = last_origin - step * np.arange(n_folds)[::-1]
+    origins = origins[origins >= MIN_TRAIN_ROWS]
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = f"{path}.tmp-{os.getpid()}.npz"
+    np.savez(tmp, X=X, y=y, origins=origins)
+    os.replace(tmp, path)
+    return X, y, origins
+
+def run_fold(variant, X, y, origin, n_jobs=1):
+    # Forecast of the max(HORIZONS) rows after origin, trained on rows <= origin
+    future = slice(origin + 1, origin + 1 + max(HORIZONS))
+    return VARIANTS[variant](X[:origin + 1], y[:origin + 1], X[future], n_jobs)
+
+def score(predictions, actual):
+    # predictions/actual: [fold, day]; metrics over the first h days of every fold
+    scores = {}
+    for h in HORIZONS:
+        err = predictions[:, :h] - actual[:, :h]
+        scores[f"{h}d"] = {
+            'mape': float(np.mean(np.abs(err) / np.abs(actual[:, :h])) * 100),
+            'rmse': float(np.sqrt(np.mean(err ** 2))),
+        }
+    return scores
+
+def backtest(asset_ids=None, variants=None, n_folds=N_FOLDS, step=FOLD_STEP, workers=None):
+    asset_ids = list(asset_ids or ASSETS)
+    variants = list(variants or VARIANTS)
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+
+    datasets = {asset_id: fold_dataset(asset_id, n_folds, step) for asset_id in asset_ids}
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = {
+            (asset_id, variant): [pool.submit(run_fold, variant, X, y, int(origin)) for origin in origins]
+            for asset_id, (X, y, origins) in datasets.items()
+            for variant in variants
+        }
+        results = []
+        for (asset_id, variant), folds in futures.items():
+            X, y, origins = datasets[asset_id]
+            if len(origins) == 0:
+                print(f"Skipping {asset_id}: not enough history for a fold")
+                continue
+            predictions = np.vstack([f.result() for f in folds])
+            actual = np.vstack([y[origin + 1:origin + 1 + max(HORIZONS)] for origin in origins])
+            results.append({
+                'asset': asset_id,
+                'variant': variant,
+                'folds': len(origins),
+                'scores': score(predictions, actual),
+            })
+
+    return {
+        'run': new_version(),
+        'n_folds': n_folds,
+        'step': step,
+        'horizons': HORIZONS,
+        'wall_seconds': time.perf_counter() - start,
+        'results': results,
+    }
+
+def print_report(report):
+    header = ''.join(f"{f'{h}d MAPE%':>11} {f'{h}d RMSE':>12}" for h in HORIZONS)
+    print(f"{'asset':<10} {'variant':<10} {'folds':>5}{header}")
+    for r in report['results']:
+        cells = ''.join(f"{r['scores'][f'{h}d']['mape']:>11.2f} {r['scores'][f'{h}d']['rmse']:>12.5g}" for h in HORIZONS)
+        print(f"{r['asset']:<10} {r['variant']:<10} {r['folds']:>5}{cells}")
+    print(f"{len(report['results'])} backtests in {report['wall_seconds']:.2f}s")
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    options = {}
+    for flag in ('--variant', '--folds', '--step', '--workers'):
+        if flag in args:
+            i = args.index(flag)
+            options[flag] = args[i + 1]
+            del args[i:i + 2]
+
+    report = backtest(
+        args or None,
+        [options['--variant']] if '--variant' in options else None,
+        int(options.get('--folds', N_FOLDS)),
+        int(options.get('--step', FOLD_STEP)),
+        int(options['--workers']) if '--workers' in options else None,
+    )
+    print_report(report)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{report['run']}.json")
+    write_atomic(path, json.dumps(report, indent=2).encode('utf-8'))
+    print(f"Saved {path}")
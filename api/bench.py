@@ -0,0 +1,287 @@
+# Benchmarks for the /predict hot path and the functions behind it.
+#
+#   python bench.py [--requests N] [--concurrency C] [--compare OLD.json] [asset ...]
+#   python bench.py --mixed URL [--requests N] [--concurrency C]
+#
+# For every coin it measures:
+#   cold  - a fresh process: create_app([coin]) time, the first single-date
+#           and timeframe requests, and the process RSS
+#   warm  - N requests per kind (single date, 1d/7d/30d/90d) through Flask's
+#           test client: p50/p95/p99 latency and throughput, optionally with
+#           C concurrent client threads
+#   micro - forecast_future per horizon, load_data, load_history and
+#           model.predict on 1, 100 and 10000 rows
+# Results are saved to benchmarks/<run>.json; --compare prints the change
+# of every p50 against an earlier run.
+#
+# --mixed measures a running server instead (gunicorn or uvicorn, see
+# asgi.py): the latency of N cached 7-day /predict requests, first on an
+# idle server, then while C clients keep posting large /predict/bulk
+# backfills. Compare the loaded p99 of both servers.
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from assets import ASSETS, BASE_DIR
+from artifacts import new_version, write_atomic
+
+RESULTS_DIR = os.path.join(BASE_DIR, 'benchmarks')
+REQUESTS = 200
+MICRO_REPEAT = 50
+# Background load of --mixed: C clients, each posting this backfill in a loop
+MIXED_CLIENTS = 4
+MIXED_BULK = {'crypto': 'BTC-USD', 'start': '2025-01-01', 'end': '2079-01-01'}
+TIMEFRAMES = ['1d', '7d', '30d', '90d']
+
+def rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except FileNotFoundError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def percentiles(seconds):
+    ms = np.asarray(seconds) * 1e3
+    return {
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p95_ms': float(np.percentile(ms, 95)),
+        'p99_ms': float(np.percentile(ms, 99)),
+        'mean_ms': float(ms.mean()),
+    }
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+def request_bodies(asset_id, n):
+    # One list of /predict bodies per request kind
+    ticker = ASSETS[asset_id]['ticker']
+    dates = pd.date_range('2025-01-01', periods=n, freq='D').strftime('%Y-%m-%d')
+    bodies = {'date': [{'crypto': ticker, 'date': d} for d in dates]}
+    for timeframe in TIMEFRAMES:
+        bodies[timeframe] = [{'crypto': ticker, 'timeframe': timeframe}] * n
+    return bodies
+
+def post(client, body):
+    response = client.post('/predict', json=body)
+    if response.status_code != 200:
+        raise RuntimeError(f"/predict returned {response.status_code}: {response.get_data(as_text=True)}")
+
+def cold_run(asset_id):
+    # Runs in a fresh interpreter (see bench_cold)
+    start = time.perf_counter()
+    from server import create_app
+    app = create_app([asset_id])
+    result = {'startup_s': time.perf_counter() - start}
+    client = app.test_client()
+    for kind, bodies in request_bodies(asset_id, 1).items():
+        result[f"first_{kind}_ms"] = timed(post, client, bodies[0]) * 1e3
+    result['rss_mb'] = rss_mb()
+    return result
+
+def bench_cold(asset_id):
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), '--cold-run', asset_id],
+                            cwd=BASE_DIR, capture_output=True, text=True, check=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    # Whole process, including the interpreter and library imports
+    result['process_s'] = time.perf_counter() - start
+    return result
+
+def bench_warm(app, asset_id, n=REQUESTS, concurrency=1):
+    results = {}
+    for kind, bodies in request_bodies(asset_id, n).items():
+        post(app.test_client(), bodies[0])
+        if concurrency == 1:
+            client = app.test_client()
+            start = time.perf_counter()
+            latencies = [timed(post, client, body) for body in bodies]
+        else:
+            chunks = [bodies[i::concurrency] for i in range(concurrency)]
+
+            def run(chunk):
+                client = app.test_client()
+                return [timed(post, client, body) for body in chunk]
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(concurrency) as pool:
+                latencies = [t for chunk in pool.map(run, chunks) for t in chunk]
+        wall = time.perf_counter() - start
+        results[kind] = dict(percentiles(latencies), requests=n, throughput_rps=n / wall)
+    return results
+
+def micro(fn, *args, repeat=MICRO_REPEAT):
+    fn(*args)
+    times = [timed(fn, *args) for _ in range(repeat)]
+    return percentiles(times)
+
+def bench_micro(app, asset_id):
+    from predictor import load_data, forecast_future, date_features
+    from arena import load_history
+    loaded = app.config['ASSETS'][asset_id]
+    model, df = loaded['model'], loaded['df']
+    results = {f"forecast_future_{days}d": micro(forecast_future, df, model, days) for days in (1, 7, 30, 90)}
+    results['load_data'] = micro(load_data, asset_id, repeat=10)
+    results['load_history'] = micro(load_history, asset_id)
+    for rows in (1, 100, 10000):
+        X = date_features(pd.date_range('2025-01-01', periods=rows, freq='D'))
+        results[f"predict_{rows}_rows"] = micro(model.predict, X)
+    return results
+
+def http_post(url, body, timeout=120):
+    # Returns the status code
+    request = urllib.request.Request(url, data=json.dumps(body).encode('utf-8'),
+                                     headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+def bench_mixed(url, n=REQUESTS, clients=MIXED_CLIENTS):
+    url = url.rstrip('/')
+    body = {'crypto': 'BTC-USD', 'timeframe': '7d'}
+
+    def cheap_latencies():
+        latencies = []
+        for _ in range(n):
+            start = time.perf_counter()
+            status = http_post(f"{url}/predict", body)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                raise RuntimeError(f"/predict returned {status}")
+        return latencies
+
+    http_post(f"{url}/predict", body)
+    idle = cheap_latencies()
+
+    stop = threading.Event()
+    statuses = []
+
+    def backfill():
+        while not stop.is_set():
+            statuses.append(http_post(f"{url}/predict/bulk", MIXED_BULK))
+
+    threads = [threading.Thread(target=backfill, daemon=True) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    # Let every client get its first backfill in flight
+    time.sleep(1.0)
+    start = time.perf_counter()
+    loaded = cheap_latencies()
+    wall = time.perf_counter() - start
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return {
+        'idle': percentiles(idle),
+        'loaded': percentiles(loaded),
+        'bulk_clients': clients,
+        'bulk_done_per_s': statuses.count(200) / wall,
+        'bulk_rejected': sum(status == 503 for status in statuses),
+    }
+
+def environment():
+    import xgboost
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'xgboost': xgboost.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'commit': commit,
+    }
+
+def run(asset_ids=None, n=REQUESTS, concurrency=1):
+    from server import create_app
+    asset_ids = list(asset_ids or ASSETS)
+    report = {'run': new_version(), 'environment': environment(), 'requests': n,
+              'concurrency': concurrency, 'assets': {}}
+    for asset_id in asset_ids:
+        print(f"Benchmarking {asset_id}...")
+        cold = bench_cold(asset_id)
+        # Same app as the legacy per-coin service
+        app = create_app([asset_id])
+        report['assets'][asset_id] = {
+            'cold': cold,
+            'warm': bench_warm(app, asset_id, n, concurrency),
+            'micro': bench_micro(app, asset_id),
+            'rss_mb': rss_mb(),
+        }
+    return report
+
+def print_report(report, baseline=None):
+    for asset_id, result in report['assets'].items():
+        cold = result['cold']
+        print(f"\n{asset_id}: startup {cold['startup_s']:.2f}s ({cold['process_s']:.2f}s with imports), "
+              f"cold RSS {cold['rss_mb']:.0f} MB, first date {cold['first_date_ms']:.1f} ms, first 7d {cold['first_7d_ms']:.1f} ms")
+        rows = [(f"/predict {kind}", stats) for kind, stats in result['warm'].items()]
+        rows += list(result['micro'].items())
+        for name, stats in rows:
+            line = f"  {name:<24} p50 {stats['p50_ms']:8.3f} ms  p95 {stats['p95_ms']:8.3f}  p99 {stats['p99_ms']:8.3f}"
+            if 'throughput_rps' in stats:
+                line += f"  {stats['throughput_rps']:8.0f} req/s"
+            old = baseline and baseline['assets'].get(asset_id)
+            if old:
+                section = 'warm' if name.startswith('/predict') else 'micro'
+                key = name.split(' ', 1)[1] if section == 'warm' else name
+                if key in old[section]:
+                    line += f"  ({stats['p50_ms'] / old[section][key]['p50_ms'] - 1:+.0%} p50)"
+            print(line)
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    if args[:1] == ['--cold-run']:
+        print(json.dumps(cold_run(args[1])))
+        sys.exit(0)
+
+    options = {}
+    for flag in ('--requests', '--concurrency', '--compare', '--mixed'):
+        if flag in args:
+            i = args.index(flag)
+            options[flag] = args[i + 1]
+            del args[i:i + 2]
+
+    if '--mixed' in options:
+        report = {'run': new_version(), 'environment': environment(), 'url': options['--mixed'],
+                  'mixed': bench_mixed(options['--mixed'], int(options.get('--requests', REQUESTS)),
+                                       int(options.get('--concurrency', MIXED_CLIENTS)))}
+        mixed = report['mixed']
+        for phase in ('idle', 'loaded'):
+            stats = mixed[phase]
+            print(f"/predict 7d {phase:<7} p50 {stats['p50_ms']:8.3f} ms  p95 {stats['p95_ms']:8.3f}  p99 {stats['p99_ms']:8.3f}")
+        print(f"bulk backfills: {mixed['bulk_done_per_s']:.1f}/s from {mixed['bulk_clients']} clients, "
+              f"{mixed['bulk_rejected']} turned away")
+    else:
+        report = run(args or None, int(options.get('--requests', REQUESTS)), int(options.get('--concurrency', 1)))
+        baseline = None
+        if '--compare' in options:
+            with open(options['--compare']) as f:
+                baseline = json.load(f)
+        print_report(report, baseline)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{report['run']}.json")
+    write_atomic(path, json.dumps(report, indent=2).encode('utf-8'))
+    print(f"\nSaved {path}")
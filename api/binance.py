@@ -1,4 +1,3 @@
-import yfinance as yf
 import pandas as pd
 import xgboost as xgb
 import pickle
@@ -7,11 +6,14 @@ from flask import Flask, request, jsonify
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error
 from datetime import datetime
+from fetcher import fetch_history
 
 # Step 1: Download Binance Coin data
-def download_data():
+def download_data(source=None):
+    # source: any fetcher.py source (FETCH_SOURCE by default)
     print("Downloading BNB-USD data...")
-    data = yf.download('BNB-USD', period='5y', interval='1d')
+    start = pd.Timestamp.today().normalize() - pd.DateOffset(years=5)
+    data = fetch_history('bnb', start, source=source).set_index('Date')
     data.to_csv('bnb_5years.csv')
     print("Saved to bnb_5years.csv")
     return data
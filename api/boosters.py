@@ -0,0 +1,49 @@
+import os
+import pickle
+
+import xgboost as xgb
+
+from tree_engine import FlatForest
+
+# Batches up to this size are predicted with the flattened trees
+FAST_PATH_MAX_ROWS = 64
+
+class BoosterModel:
+    """A trained XGBoost booster loaded from its native UBJSON/JSON file.
+
+    Offers the predict() the services already call on the sklearn wrapper,
+    but predicts with the booster directly (no DMatrix, no wrapper state).
+    Small batches, such as the single rows of the recursive forecasters, go
+    through a FlatForest copy of the trees, which gives identical results.
+    """
+
+    def __init__(self, booster):
+        self.booster = booster
+        self.feature_names = booster.feature_names
+        try:
+            self.forest = FlatForest.from_booster(booster)
+        except ValueError:
+            self.forest = None
+
+    def predict(self, X):
+        if self.forest is not None and len(X) <= FAST_PATH_MAX_ROWS:
+            return self.forest.predict(X)
+        # DataFrames are checked against the trained feature names
+        return self.booster.inplace_predict(X)
+
+def load_booster(path):
+    # Legacy pickles of the sklearn wrapper are still accepted
+    if os.path.splitext(path)[1] == '.pkl':
+        with open(path, 'rb') as f:
+            return BoosterModel(pickle.load(f).get_booster())
+    return BoosterModel(xgb.Booster(model_file=path))
+
+def save_booster(model, path):
+    # Accepts an XGBRegressor, a Booster or a BoosterModel
+    if isinstance(model, BoosterModel):
+        booster = model.booster
+    elif hasattr(model, 'get_booster'):
+        booster = model.get_booster()
+    else:
+        booster = model
+    booster.save_model(path)
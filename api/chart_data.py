@@ -0,0 +1,98 @@
+# Price history for the chart app (two.py), cached per (ticker, period,
+# interval) with a TTL and served as compact JSON, so a chart request
+# neither goes to Yahoo Finance nor builds a figure on the server.
+#
+# The source is injectable: YFinanceHistory for live data, FixtureHistory
+# for offline runs and tests (CHART_SOURCE=fixture in two.py).
+import json
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from downsample import downsample
+from price_store import read_frame
+
+# Seconds a cached history stays fresh, by candle interval
+CACHE_TTL = {
+    '1m': 30,
+    '5m': 60,
+    '15m': 120,
+    '30m': 300,
+    '1h': 600,
+    '1d': 3600,
+}
+DEFAULT_TTL = 300
+
+class YFinanceHistory:
+    def fetch(self, ticker, period, interval):
+        import yfinance as yf
+        data = yf.Ticker(ticker).history(period=period, interval=interval)
+        data.reset_index(inplace=True)
+        return data.rename(columns={'Datetime': 'Date'})
+
+class FixtureHistory:
+    """Daily candles from the price store (or a given DataFrame), whatever the
+    interval, cut to the requested period."""
+
+    def __init__(self, asset_id='bitcoin', frame=None):
+        self.asset_id = asset_id
+        self.frame = frame
+
+    def fetch(self, ticker, period, interval):
+        df = self.frame if self.frame is not None else read_frame(self.asset_id)
+        start = df['Date'].max() - period_length(period)
+        return df[df['Date'] > start].reset_index(drop=True)
+
+def period_length(period):
+    # yfinance periods: '5d', '1mo', '1y', ...
+    if period.endswith('mo'):
+        return pd.Timedelta(days=30 * int(period[:-2]))
+    if period.endswith('y'):
+        return pd.Timedelta(days=365 * int(period[:-1]))
+    return pd.Timedelta(days=int(period[:-1]))
+
+def history_arrays(data):
+    # Close prices, with timestamps as epoch milliseconds (Plotly 'date' axis)
+    dates = pd.DatetimeIndex(data['Date'])
+    if dates.tz is not None:
+        dates = dates.tz_convert('UTC').tz_localize(None)
+    x = dates.to_numpy().astype('datetime64[ms]').astype('int64')
+    return x, np.asarray(data['Close'], dtype='float64')
+
+def encode_history(x, y, width=None, method='lttb'):
+    # At most `width` points (see downsample.py), plus the original length
+    keep = downsample(x, y, width, method)
+    payload = {'x': x[keep].tolist(), 'y': y[keep].tolist(), 'total': len(y)}
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+class HistoryCache:
+    """Encoded price payloads keyed by (ticker, period, interval).
+
+    The fetched series is kept with one encoded payload per requested
+    (width, method), all dropped together when the TTL runs out.
+    """
+
+    def __init__(self, source, ttl=None):
+        self.source = source
+        self.ttl = ttl or CACHE_TTL
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, ticker, period, interval, width=None, method='lttb'):
+        # Returns (payload bytes, seconds left until it expires)
+        key = (ticker, period, interval)
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is None or entry['expires'] <= now:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is None or entry['expires'] <= now:
+                    x, y = history_arrays(self.source.fetch(ticker, period, interval))
+                    entry = {'expires': now + self.ttl.get(interval, DEFAULT_TTL), 'x': x, 'y': y, 'payloads': {}}
+                    self._entries[key] = entry
+        payload = entry['payloads'].get((width, method))
+        if payload is None:
+            payload = entry['payloads'][(width, method)] = encode_history(entry['x'], entry['y'], width, method)
+        return payload, max(0, int(entry['expires'] - now))
@@ -0,0 +1,79 @@
+import numpy as np
+
+# Decimation of long price series to about one point per horizontal pixel
+# of the chart, so payloads and render times stay flat as history grows.
+# Both methods return the sorted indices of the points to keep, always
+# including the first and the last one.
+
+# Bounds for the pixel width a request may ask for
+MIN_WIDTH = 10
+MAX_WIDTH = 4000
+# Widths are rounded up to a multiple of this, so caches keyed by width stay small
+WIDTH_STEP = 10
+
+def parse_width(value, default=None):
+    # Request parameter -> clamped pixel width, or default when absent
+    if value in (None, ''):
+        return default
+    width = -(-int(value) // WIDTH_STEP) * WIDTH_STEP
+    return min(max(width, MIN_WIDTH), MAX_WIDTH)
+
+def lttb(x, y, n):
+    """Largest-Triangle-Three-Buckets: n points that keep the visual shape.
+
+    Bucket averages come from cumulative sums, and each bucket's triangle
+    areas are computed as one array expression; only the walk from bucket
+    to bucket (each choice depends on the previous one) is a Python loop.
+    """
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    size = len(y)
+    if n >= size or size <= 2:
+        return np.arange(size)
+    n = max(n, 3)
+
+    # n - 2 buckets over the points between the first and the last
+    edges = np.linspace(1, size - 1, n - 1).astype(np.int64)
+    cx = np.concatenate([[0.0], np.cumsum(x)])
+    cy = np.concatenate([[0.0], np.cumsum(y)])
+    counts = np.diff(edges)
+    avg_x = (cx[edges[1:]] - cx[edges[:-1]]) / counts
+    avg_y = (cy[edges[1:]] - cy[edges[:-1]]) / counts
+    # The bucket after the last one is the final point
+    avg_x = np.append(avg_x[1:], x[-1])
+    avg_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(n, dtype=np.int64)
+    selected[0], selected[-1] = 0, size - 1
+    a = 0
+    for b in range(n - 2):
+        lo, hi = edges[b], edges[b + 1]
+        area = np.abs((x[a] - avg_x[b]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y[b] - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[b + 1] = a
+    return selected
+
+def minmax(y, n):
+    # The lowest and highest point of (n - 2) // 2 equal buckets; fully vectorized
+    y = np.asarray(y, dtype='float64')
+    size = len(y)
+    if n >= size or size <= 2:
+        return np.arange(size)
+    buckets = max((n - 2) // 2, 1)
+    edges = np.linspace(0, size, buckets + 1).astype(np.int64)
+    bucket = np.repeat(np.arange(buckets), np.diff(edges))
+    order = np.lexsort((y, bucket))
+    starts = edges[:-1]
+    ends = edges[1:] - 1
+    keep = np.concatenate([[0, size - 1], order[starts], order[ends]])
+    return np.unique(keep)
+
+def downsample(x, y, width, method='lttb'):
+    # Indices of at most `width` points of the series (x, y)
+    if width is None or len(y) <= width:
+        return np.arange(len(y))
+    if method == 'minmax':
+        return minmax(y, width)
+    if method == 'lttb':
+        return lttb(x, y, width)
+    raise ValueError(f"Unknown downsampling method '{method}'")
@@ -0,0 +1,73 @@
+# Response encodings of the prediction API, picked from the Accept header.
+#
+#   application/json                     the default: dates as 'YYYY-MM-DD'
+#                                        strings, prices as lists of floats
+#   application/vnd.crypto-columns+json  columnar: dates as int32 days since
+#                                        1970-01-01 and prices as number
+#                                        arrays, encoded straight from the
+#                                        NumPy arrays by orjson if installed
+#   application/x-msgpack                the columnar document as MessagePack,
+#                                        every array as little-endian bytes
+#                                        (int32 days, float64 closes, float32
+#                                        predictions); needs msgpack
+#
+# Clients that don't ask for a columnar type by name get plain JSON.
+import json
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON = 'application/json'
+COLUMNS_JSON = 'application/vnd.crypto-columns+json'
+MSGPACK = 'application/x-msgpack'
+
+def negotiate(accept_mimetypes):
+    offered = [JSON, COLUMNS_JSON] + ([MSGPACK] if msgpack is not None else [])
+    return accept_mimetypes.best_match(offered, default=JSON)
+
+def epoch_days(dates):
+    return np.asarray(dates).astype('datetime64[D]').astype(np.int32)
+
+def encode_json(obj):
+    # Same encoding as Flask's jsonify in production (compact, sorted keys)
+    return json.dumps(obj, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+def array_list(a):
+    return a.tolist()
+
+def encode_columns(obj):
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_SORT_KEYS)
+    return json.dumps(obj, sort_keys=True, separators=(',', ':'), default=array_list).encode('utf-8')
+
+def array_bytes(a):
+    return a.astype(a.dtype.newbyteorder('<'), copy=False).tobytes()
+
+def encode_msgpack(obj):
+    return msgpack.packb(obj, default=array_bytes)
+
+ENCODERS = {JSON: encode_json, COLUMNS_JSON: encode_columns, MSGPACK: encode_msgpack}
+
+def encode(obj, mimetype=JSON):
+    return ENCODERS[mimetype](obj)
+
+def encode_forecast_response(crypto, timeframe, result_bytes, mimetype=JSON):
+    # Splice the cached result into the /predict envelope without re-encoding it
+    if mimetype == MSGPACK:
+        # A map of 4 entries, in the same order as the JSON one
+        return (b'\x84' + msgpack.packb('crypto') + msgpack.packb(crypto) +
+                msgpack.packb('result') + result_bytes +
+                msgpack.packb('success') + msgpack.packb(True) +
+                msgpack.packb('timeframe') + msgpack.packb(timeframe))
+    return (b'{"crypto":' + encode_json(crypto) +
+            b',"result":' + result_bytes +
+            b',"success":true,"timeframe":' + encode_json(timeframe) + b'}\n')
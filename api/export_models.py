@@ -0,0 +1,22 @@
+# Convert pickled XGBRegressor models to XGBoost's native UBJSON format.
+# Usage: python export_models.py btc_model.pkl [eth_model.pkl ...]
+import os
+import pickle
+import sys
+
+from boosters import save_booster
+
+def export_model(pkl_path):
+    with open(pkl_path, 'rb') as f:
+        model = pickle.load(f)
+    out_path = os.path.splitext(pkl_path)[0] + '.ubj'
+    save_booster(model, out_path)
+    print(f"{pkl_path} -> {out_path}")
+    return out_path
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("Usage: python export_models.py <model.pkl> [<model.pkl> ...]")
+        sys.exit(1)
+    for path in sys.argv[1:]:
+        export_model(path)
@@ -0,0 +1,196 @@
+# Concurrent daily-candle downloads for any number of coins.
+#
+# fetch_all() downloads every requested coin at once on an asyncio loop:
+# at most `concurrency` requests in flight, request starts spaced to at
+# most `rate` per second, and failed requests retried with exponential
+# backoff. A full refresh takes about as long as the slowest coin rather
+# than the sum of all of them.
+#
+# Sources are adapters with `fetch(asset_id, start, end=None)` returning
+# the candles in [start, end) with the price store's columns. fetch may be
+# a coroutine function; blocking ones run in a worker thread.
+#   yahoo[:URL]      Yahoo's chart API over plain HTTP; URL replaces the
+#                    API base, e.g. a local stand-in serving the same JSON
+#   yfinance         the yfinance package
+#   fixture[:DIR]    the registry CSVs, or DIR/<asset>.csv
+# The default source is FETCH_SOURCE, else yfinance.
+import asyncio
+import json
+import os
+import random
+import time
+import urllib.request
+from datetime import datetime, timezone
+from urllib.parse import quote, urlencode
+
+import pandas as pd
+
+from assets import ASSETS, asset_path
+from price_store import COLUMNS, read_price_csv
+
+DEFAULT_SOURCE = 'yfinance'
+YAHOO_CHART_URL = 'https://query2.finance.yahoo.com/v8/finance/chart'
+
+# Requests in flight at once, request starts per second, retries per coin
+CONCURRENCY = 8
+RATE = 8.0
+RETRIES = 3
+# Seconds before the first retry; doubled (plus jitter) for every next one
+BACKOFF = 1.0
+# Seconds one request may take
+TIMEOUT = 30.0
+
+def closed_candles(df):
+    # Today's candle is still open; it is picked up by the next run instead
+    today = pd.Timestamp(datetime.now(timezone.utc).date())
+    return df[df['Date'] < today][list(COLUMNS)].reset_index(drop=True)
+
+def to_timestamp(value):
+    # Naive UTC timestamp from a date string, datetime or Timestamp
+    ts = pd.Timestamp(value)
+    return ts.tz_convert('UTC').tz_localize(None) if ts.tz is not None else ts
+
+class YahooChartSource:
+    """Candles from Yahoo's chart API, fetched with urllib (no extra packages)."""
+
+    name = 'yahoo'
+
+    def __init__(self, base_url=None, timeout=TIMEOUT):
+        self.base_url = (base_url or YAHOO_CHART_URL).rstrip('/')
+        self.timeout = timeout
+
+    def url(self, asset_id, start, end=None):
+        end = to_timestamp(end) if end is not None else pd.Timestamp(datetime.now(timezone.utc).date()) + pd.Timedelta(days=1)
+        params = {
+            'period1': int(to_timestamp(start).timestamp()),
+            'period2': int(end.timestamp()),
+            'interval': '1d',
+        }
+        return f"{self.base_url}/{quote(ASSETS[asset_id]['ticker'])}?{urlencode(params)}"
+
+    def get(self, url):
+        request = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.load(response)
+
+    async def fetch(self, asset_id, start, end=None):
+        payload = await asyncio.to_thread(self.get, self.url(asset_id, start, end))
+        return closed_candles(chart_frame(payload))
+
+def chart_frame(payload):
+    # Chart API JSON -> DataFrame with the store's columns
+    chart = payload['chart']
+    if chart.get('error'):
+        raise ValueError(chart['error'].get('description') or str(chart['error']))
+    result = chart['result'][0]
+    timestamps = result.get('timestamp') or []
+    quotes = result['indicators']['quote'][0] if timestamps else {}
+    df = pd.DataFrame({
+        'Date': pd.to_datetime(timestamps, unit='s').normalize(),
+        'Open': quotes.get('open', []),
+        'High': quotes.get('high', []),
+        'Low': quotes.get('low', []),
+        'Close': quotes.get('close', []),
+        'Volume': quotes.get('volume', []),
+    })
+    return df.dropna().drop_duplicates('Date', keep='last')
+
+class YFinanceSource:
+    name = 'yfinance'
+
+    def fetch(self, asset_id, start, end=None):
+        import yfinance as yf
+        # Ticker.history keeps no shared state, unlike yf.download, so
+        # several coins can be fetched from threads at once
+        df = yf.Ticker(ASSETS[asset_id]['ticker']).history(
+            start=to_timestamp(start).strftime('%Y-%m-%d'),
+            end=to_timestamp(end).strftime('%Y-%m-%d') if end is not None else None,
+            interval='1d', auto_adjust=True, raise_errors=True)
+        df.reset_index(inplace=True)
+        df.dropna(inplace=True)
+        df['Date'] = pd.to_datetime(df['Date']).dt.tz_localize(None).dt.normalize()
+        return closed_candles(df)
+
+class FixtureSource:
+    """Candles from local CSV files, in the same formats price_store reads."""
+
+    name = 'fixture'
+
+    def __init__(self, directory=None):
+        self.directory = directory
+
+    def fetch(self, asset_id, start, end=None):
+        if self.directory:
+            path = os.path.join(self.directory, f"{asset_id}.csv")
+        else:
+            path = asset_path(ASSETS[asset_id]['data'])
+        df = read_price_csv(path)
+        df = df[df['Date'] >= to_timestamp(start)]
+        if end is not None:
+            df = df[df['Date'] < to_timestamp(end)]
+        return df.reset_index(drop=True)
+
+def make_source(spec=None):
+    # 'yahoo', 'yahoo:<url>', 'yfinance', 'fixture' or 'fixture:<directory>'
+    spec = spec or os.environ.get('FETCH_SOURCE', DEFAULT_SOURCE)
+    name, _, arg = spec.partition(':')
+    if name == 'yahoo':
+        return YahooChartSource(arg or None)
+    if name == 'yfinance':
+        return YFinanceSource()
+    if name == 'fixture':
+        return FixtureSource(arg or None)
+    raise ValueError(f"Unknown source '{spec}'")
+
+class RateLimiter:
+    # Spaces request starts at least 1 / rate seconds apart
+    def __init__(self, rate=RATE):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+
+    async def wait(self):
+        now = time.monotonic()
+        start = max(now, self._next)
+        self._next = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+async def call(source, asset_id, start, end):
+    if asyncio.iscoroutinefunction(source.fetch):
+        return await source.fetch(asset_id, start, end)
+    return await asyncio.to_thread(source.fetch, asset_id, start, end)
+
+async def fetch_one(source, asset_id, start, end, slots, limiter, retries, timeout):
+    for attempt in range(retries + 1):
+        async with slots:
+            await limiter.wait()
+            try:
+                return await asyncio.wait_for(call(source, asset_id, start, end), timeout)
+            except Exception as e:
+                error = e
+        if attempt < retries:
+            delay = BACKOFF * 2 ** attempt * (1 + random.random())
+            print(f"{asset_id}: attempt {attempt + 1} failed ({str(error) or type(error).__name__}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+    raise error
+
+async def fetch_all_async(starts, source, end=None, concurrency=CONCURRENCY, rate=RATE,
+                          retries=RETRIES, timeout=TIMEOUT):
+    slots = asyncio.Semaphore(concurrency)
+    limiter = RateLimiter(rate)
+    results = await asyncio.gather(*(
+        fetch_one(source, asset_id, start, end, slots, limiter, retries, timeout)
+        for asset_id, start in starts.items()
+    ), return_exceptions=True)
+    return dict(zip(starts, results))
+
+def fetch_all(starts, source=None, end=None, **limits):
+    # {asset_id: start} -> {asset_id: DataFrame, or the exception of its last attempt}
+    return asyncio.run(fetch_all_async(starts, source or make_source(), end, **limits))
+
+def fetch_history(asset_id, start, end=None, source=None, **limits):
+    # One coin; raises when every attempt failed
+    result = fetch_all({asset_id: start}, source, end, **limits)[asset_id]
+    if isinstance(result, BaseException):
+        raise result
+    return result
@@ -0,0 +1,159 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from assets import ASSETS, asset_path
+from price_store import current_version
+from predictor import TIMEFRAME_MAP, load_model, forecast_future, date_features
+from arena import current_arena_version, load_history
+from encoding import JSON, encode
+
+# How often (seconds) the model/data files are checked for changes
+CHECK_INTERVAL = 5.0
+
+def model_version(asset_id):
+    st = os.stat(asset_path(ASSETS[asset_id]['model']))
+    return f"{st.st_mtime_ns:x}-{st.st_size:x}"
+
+def asset_version(asset_id):
+    # The version changes whenever the model file, the price store or the
+    # arena is replaced. A history loaded while the arena lagged behind the
+    # store is a private copy; the rebuild then moves it back to the arena
+    return f"{model_version(asset_id)}.{current_version(asset_id)}@{current_arena_version()}"
+
+def validate(asset_id, model, df):
+    # Returns why a freshly loaded model/history must not be served, or None
+    if model is None or df is None:
+        return "model or data failed to load"
+    if len(df) == 0:
+        return "empty price history"
+    if not np.isfinite(np.asarray(df['Close'][-30:], dtype='float64')).all():
+        return "non-finite closes in the price history"
+    expected = ASSETS[asset_id]['features']
+    if model.feature_names and list(model.feature_names) != expected:
+        return f"model features {model.feature_names} != {expected}"
+    last_date = pd.Timestamp(np.asarray(df['Date'])[-1])
+    prices = model.predict(date_features(pd.date_range(last_date, periods=max(TIMEFRAME_MAP.values()), freq='D')))
+    if not np.isfinite(prices).all():
+        return "non-finite predictions"
+    return None
+
+def forecast_body(df, model, days, mimetype=JSON):
+    return encode(forecast_future(df, model, days, columnar=mimetype != JSON), mimetype)
+
+class ForecastCache:
+    """Pre-encoded forecast results keyed by (asset, horizon, model version,
+    encoding); only plain JSON is warmed, the columnar encodings on first use.
+
+    ``loaded`` is the server's asset dict ({asset_id: {'model', 'df', 'version'}}).
+    When an asset's model or data files change, the new version is loaded,
+    validated and warmed in the background, then swapped in with a single
+    assignment; requests keep using the previous version until then.
+    """
+
+    def __init__(self, loaded, check_interval=CHECK_INTERVAL):
+        self.loaded = loaded
+        self.check_interval = check_interval
+        self._entries = {}
+        self._last_check = {}
+        # Versions that failed validation, not retried until the files change again
+        self._failed = {}
+        self._reloading = set()
+        self._lock = threading.Lock()
+        self._watcher = None
+
+    def warm(self, asset_ids=None):
+        for asset_id in asset_ids or list(self.loaded):
+            for days in sorted(set(TIMEFRAME_MAP.values())):
+                self.get(asset_id, days, check=False)
+
+    def stale_version(self, asset_id):
+        # The on-disk version if it differs from the served one and hasn't failed
+        try:
+            version = asset_version(asset_id)
+        except OSError:
+            return None
+        if version in (self.loaded[asset_id]['version'], self._failed.get(asset_id)):
+            return None
+        return version
+
+    def check(self, asset_id):
+        # Cheap enough for the request path: at most one stat per interval,
+        # and the reload itself runs in a background thread
+        now = time.monotonic()
+        if now - self._last_check.get(asset_id, 0.0) < self.check_interval:
+            return
+        self._last_check[asset_id] = now
+        version = self.stale_version(asset_id)
+        if version is not None and asset_id not in self._reloading:
+            self._reloading.add(asset_id)
+            threading.Thread(target=self._background_reload, args=(asset_id, version),
+                             name=f"reload-{asset_id}", daemon=True).start()
+
+    def _background_reload(self, asset_id, version):
+        try:
+            self.reload(asset_id, version)
+        finally:
+            self._reloading.discard(asset_id)
+
+    def reload(self, asset_id, version=None):
+        # Returns True when the asset is serving the on-disk version afterwards
+        with self._lock:
+            version = version or asset_version(asset_id)
+            previous = self.loaded[asset_id]
+            if version == previous['version']:
+                return True
+            # Only reload what changed: new candles keep the model, a new
+            # model keeps the history
+            old_model, old_data = previous['version'].split('.', 1)
+            new_model, new_data = version.split('.', 1)
+            try:
+                model = previous['model'] if new_model == old_model else load_model(asset_id)
+                df = previous['df'] if new_data == old_data else load_history(asset_id)
+                error = validate(asset_id, model, df)
+            except Exception as e:
+                error = str(e).splitlines()[0]
+            if error:
+                print(f"Keeping {ASSETS[asset_id]['ticker']} version {previous['version']}: {error}")
+                self._failed[asset_id] = version
+                return False
+
+            # Warm the new version before it becomes visible so no request
+            # has to compute a forecast on the spot
+            for days in sorted(set(TIMEFRAME_MAP.values())):
+                self._entries[(asset_id, days, version, JSON)] = forecast_body(df, model, days)
+            self.loaded[asset_id] = {'model': model, 'df': df, 'version': version}
+            self._entries = {key: body for key, body in self._entries.items()
+                             if key[0] != asset_id or key[2] == version}
+            print(f"Reloaded {ASSETS[asset_id]['ticker']} version {version}")
+            return True
+
+    def watch(self):
+        while True:
+            time.sleep(self.check_interval)
+            for asset_id in list(self.loaded):
+                version = self.stale_version(asset_id)
+                if version is not None:
+                    self.reload(asset_id, version)
+
+    def start_watcher(self):
+        # Threads don't survive a fork, so every worker process starts its own
+        if self._watcher is None or not self._watcher.is_alive():
+            self._watcher = threading.Thread(target=self.watch, name='model-watcher', daemon=True)
+            self._watcher.start()
+
+    def get(self, asset_id, days, check=True, loaded=None, mimetype=JSON):
+        # loaded: a snapshot of self.loaded[asset_id] the caller also reads
+        # the version tag from, so body and tag always match
+        if check:
+            self.check(asset_id)
+        loaded = loaded or self.loaded[asset_id]
+        key = (asset_id, days, loaded['version'], mimetype)
+        body = self._entries.get(key)
+        if body is None:
+            body = forecast_body(loaded['df'], loaded['model'], days, mimetype)
+            self._entries[key] = body
+        return body
@@ -1,7 +1,6 @@
-import yfinance as yf
 import pandas as pd
-from ta.trend import SMAIndicator, EMAIndicator, MACD
-from ta.momentum import RSIIndicator
+from fetcher import fetch_history
+from indicators import ema, macd, rsi, sma
 from datetime import datetime, timedelta
 
 # Step 1: Auto set last 1 year dates
@@ -11,25 +10,23 @@ def get_date_range():
     return start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')
 
 # Step 2: Download ETH historical data
-def fetch_eth_data(start_date, end_date, interval='1d'):
+def fetch_eth_data(start_date, end_date, source=None):
+    # source: any fetcher.py source (FETCH_SOURCE by default)
     print("📥 Fetching Ethereum data...")
-    eth = yf.download("ETH-USD", start=start_date, end=end_date, interval=interval, auto_adjust=True)
-    eth.reset_index(inplace=True)
-    eth.columns = [col[0] if isinstance(col, tuple) else col for col in eth.columns]  # Flatten MultiIndex
-    eth.dropna(inplace=True)
-    return eth
+    return fetch_history('ethereum', start_date, end_date, source=source)
 
 # Step 3: Add technical indicators
 def add_technical_indicators(df):
     print("📊 Adding technical indicators...")
 
-    close_series = df['Close']
-    df['SMA_20'] = SMAIndicator(close=close_series, window=20).sma_indicator()
-    df['SMA_50'] = SMAIndicator(close=close_series, window=50).sma_indicator()
-    df['RSI'] = RSIIndicator(close=close_series, window=14).rsi()
-    df['MACD'] = MACD(close=close_series).macd_diff()
-    df['EMA_12'] = EMAIndicator(close=close_series, window=12).ema_indicator()
-    df['EMA_26'] = EMAIndicator(close=close_series, window=26).ema_indicator()
+    # Same values as the ta indicators these columns were first built with
+    close = df['Close'].to_numpy(dtype='float64')
+    df['SMA_20'] = sma(close, 20)
+    df['SMA_50'] = sma(close, 50)
+    df['RSI'] = rsi(close, 14, smoothing='wilder')
+    df['MACD'] = macd(close, min_periods=True)
+    df['EMA_12'] = ema(close, 12, min_periods=12)
+    df['EMA_26'] = ema(close, 26, min_periods=26)
 
     df.dropna(inplace=True)
     return df
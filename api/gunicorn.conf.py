@@ -0,0 +1,30 @@
+# Gunicorn settings for the prediction API (see wsgi.py).
+# Every value can be overridden with an environment variable.
+import multiprocessing
+import os
+
+bind = os.environ.get('API_BIND', '0.0.0.0:5480')
+workers = int(os.environ.get('API_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.environ.get('API_THREADS', 4))
+timeout = int(os.environ.get('API_TIMEOUT', 30))
+
+# Load the models in the master before forking the workers
+preload_app = True
+# Run the app from the api/ directory regardless of where gunicorn is started
+chdir = os.path.dirname(os.path.abspath(__file__))
+wsgi_app = 'wsgi:app'
+
+accesslog = os.environ.get('API_ACCESS_LOG', '-')
+
+# Workers write their metrics here so /metrics can add them up (see metrics.py)
+os.environ.setdefault('API_METRICS_DIR', os.path.join(chdir, 'metrics-gunicorn'))
+
+def on_starting(server):
+    # Counters start from zero with every master, drop the last run's snapshots
+    import shutil
+    shutil.rmtree(os.environ['API_METRICS_DIR'], ignore_errors=True)
+
+def post_fork(server, worker):
+    # The model watcher thread has to be started in each worker, after the fork
+    from wsgi import app
+    app.config['FORECAST_CACHE'].start_watcher()
@@ -0,0 +1,152 @@
+import numpy as np
+
+# Batch indicators over a whole price series. Each function returns a
+# float64 NumPy array aligned with the input, with NaN where pandas gives NaN.
+
+def ema_alpha(span):
+    # Same smoothing factor pandas derives from span
+    com = (span - 1) / 2.0
+    return 1.0 / (1.0 + com)
+
+def lag(values, k):
+    values = np.asarray(values, dtype='float64')
+    out = np.full(len(values), np.nan)
+    if k < len(values):
+        out[k:] = values[:len(values) - k]
+    return out
+
+def pct_change(values):
+    # Same formula as Series.pct_change(): x[t] / x[t-1] - 1
+    values = np.asarray(values, dtype='float64')
+    out = np.full(len(values), np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out[1:] = values[1:] / values[:-1] - 1
+    return out
+
+def sma(values, window):
+    # rolling(window).mean(): NaN until the window is full
+    values = np.asarray(values, dtype='float64')
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        out[window - 1:] = np.lib.stride_tricks.sliding_window_view(values, window).mean(axis=1)
+    return out
+
+def ema(values, span=None, alpha=None, min_periods=0, initial=None):
+    # ewm(span=..., adjust=False).mean(), including pandas' handling of
+    # leading and interior NaNs. The recursion is inherently sequential.
+    # initial is the EMA of the value just before values[0], to continue a
+    # series from its tail with the same result as the full recursion.
+    values = np.asarray(values, dtype='float64')
+    alpha = ema_alpha(span) if alpha is None else alpha
+    out = np.full(len(values), np.nan)
+    weighted = np.nan if initial is None else float(initial)
+    old_wt = 1.0
+    nobs = 0 if initial is None else max(min_periods, 1)
+    for i, cur in enumerate(values.tolist()):
+        is_observation = cur == cur
+        nobs += is_observation
+        if weighted == weighted:
+            old_wt *= 1.0 - alpha
+            if is_observation:
+                if weighted != cur:
+                    weighted = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+                old_wt = 1.0
+        elif is_observation:
+            weighted = cur
+        if nobs >= max(min_periods, 1):
+            out[i] = weighted
+    return out
+
+def rsi(values, period=14, smoothing='sma'):
+    # smoothing='sma' is the rolling-mean RSI the DOGE service always used;
+    # smoothing='wilder' matches ta.momentum.RSIIndicator, which produced
+    # the RSI columns in the *_last_*_year.csv files
+    values = np.asarray(values, dtype='float64')
+    delta = np.full(len(values), np.nan)
+    delta[1:] = np.diff(values)
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if smoothing == 'sma':
+            avg_gain, avg_loss = sma(gain, period), sma(loss, period)
+            return 100 - (100 / (1 + avg_gain / avg_loss))
+        if smoothing == 'wilder':
+            avg_gain = ema(gain, alpha=1.0 / period, min_periods=period)
+            avg_loss = ema(loss, alpha=1.0 / period, min_periods=period)
+            return np.where(avg_loss == 0, 100, 100 - (100 / (1 + avg_gain / avg_loss)))
+    raise ValueError(f"Unknown RSI smoothing '{smoothing}'")
+
+def macd(values, fast=12, slow=26, signal=9, min_periods=False):
+    # MACD histogram (MACD line minus signal line). min_periods=True masks
+    # the warm-up rows with NaN like ta.trend.MACD.macd_diff()
+    fast_ema = ema(values, fast, min_periods=fast if min_periods else 0)
+    slow_ema = ema(values, slow, min_periods=slow if min_periods else 0)
+    macd_line = fast_ema - slow_ema
+    signal_line = ema(macd_line, signal, min_periods=signal if min_periods else 0)
+    return macd_line - signal_line
+
+# Incremental mode, for the recursive forecasters
+
+class IndicatorState:
+    """Streaming close-price indicators for the recursive forecasters.
+
+    Seeded once from the known history with the batch functions above, then
+    every predicted close is added with push(), which updates the SMAs,
+    EMAs, lags and returns in O(1). Values match the batch functions for
+    the same series.
+    """
+
+    def __init__(self, closes, sma_windows=(20, 50), ema_spans=(12, 26), max_lag=4):
+        closes = np.asarray(closes, dtype='float64')
+        self.size = max(max(sma_windows), max_lag)
+        self.buffer = np.full(self.size, np.nan)
+        tail = closes[-self.size:]
+        self.buffer[:len(tail)] = tail
+        self.pos = len(tail) % self.size
+        self.count = len(closes)
+
+        # Fresh sums of the seed window, then running sums from here on
+        self.sums = {w: float(closes[-w:].sum()) for w in sma_windows}
+        self.emas = {span: float(ema(closes, span)[-1]) for span in ema_spans}
+        self.alphas = {span: ema_alpha(span) for span in ema_spans}
+
+    def lag(self, k):
+        # lag(1) is the latest close, lag(2) the one before it, ...
+        if k > min(self.count, self.size):
+            return np.nan
+        return self.buffer[(self.pos - k) % self.size]
+
+    def sma(self, window):
+        if self.count < window:
+            return np.nan
+        return self.sums[window] / window
+
+    def ema(self, span):
+        return self.emas[span]
+
+    def pct_return(self):
+        # (x[t] - x[t-1]) / x[t-1]
+        prev = self.lag(2)
+        return (self.lag(1) - prev) / prev
+
+    def pct_change(self):
+        # x[t] / x[t-1] - 1, the formula of Series.pct_change() and pct_change()
+        return self.lag(1) / self.lag(2) - 1
+
+    def push(self, close):
+        close = float(close)
+        for w in self.sums:
+            self.sums[w] += close
+            if self.count >= w:
+                self.sums[w] -= self.lag(w)
+        for span, alpha in self.alphas.items():
+            self.emas[span] = ema_step(self.emas[span], close, alpha)
+        self.buffer[self.pos] = close
+        self.pos = (self.pos + 1) % self.size
+        self.count += 1
+
+def ema_step(old, cur, alpha):
+    # One step of pandas' adjust=False recursion, including its normalisation
+    if old == cur:
+        return old
+    return ((1.0 - alpha) * old + alpha * cur) / ((1.0 - alpha) + alpha)
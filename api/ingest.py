@@ -0,0 +1,80 @@
+# Incremental price ingestion: fetch only the candles newer than the last
+# stored date, append them to the price store and extend the arena with
+# just those rows. Running servers pick the new store version up on their
+# next version check and reload only the assets that changed.
+#
+#   python ingest.py [--source yahoo[:URL]|yfinance|fixture[:DIR]]
+#                    [--concurrency 8] [--rate 8] [asset ...]
+#
+# All coins are downloaded concurrently (see fetcher.py). The source can
+# also be set with INGEST_SOURCE. 'fixture' replays the registry CSVs (or
+# DIR/<asset>.csv) so the pipeline runs offline.
+import os
+import sys
+from datetime import timedelta
+
+import pandas as pd
+
+from assets import ASSETS
+from price_store import append_store, read_columns
+from arena import build_arena
+from fetcher import DEFAULT_SOURCE, fetch_all, fetch_history, make_source
+
+def next_start(asset_id):
+    # The day after the last stored candle
+    return pd.Timestamp(read_columns(asset_id)['Date'][-1]) + timedelta(days=1)
+
+def store_rows(asset_id, start, rows, source):
+    # Returns the number of candles appended
+    version, appended = append_store(asset_id, rows, source=source.name)
+    if version is None:
+        print(f"{asset_id}: up to date ({(start - timedelta(days=1)).date()})")
+    else:
+        print(f"{asset_id}: appended {appended} rows -> store version {version}")
+    return appended
+
+def ingest(asset_id, source):
+    # Returns the number of candles appended
+    start = next_start(asset_id)
+    return store_rows(asset_id, start, fetch_history(asset_id, start, source=source), source)
+
+def ingest_all(asset_ids=None, source=None, **limits):
+    # limits: concurrency, rate, retries, timeout (see fetch_all)
+    source = source or make_source(os.environ.get('INGEST_SOURCE', DEFAULT_SOURCE))
+    starts = {}
+    for asset_id in asset_ids or list(ASSETS):
+        try:
+            starts[asset_id] = next_start(asset_id)
+        except Exception as e:
+            print(f"Error ingesting {asset_id}: {str(e)}")
+
+    # Downloads run concurrently; appending to the store afterwards is quick
+    changed = []
+    for asset_id, rows in fetch_all(starts, source, **limits).items():
+        try:
+            if isinstance(rows, BaseException):
+                raise rows
+            if store_rows(asset_id, starts[asset_id], rows, source):
+                changed.append(asset_id)
+        except Exception as e:
+            print(f"Error ingesting {asset_id}: {str(e)}")
+    if changed:
+        build_arena()
+    return changed
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    options = {}
+    for flag in ('--source', '--concurrency', '--rate'):
+        if flag in args:
+            i = args.index(flag)
+            options[flag] = args[i + 1]
+            del args[i:i + 2]
+
+    source = make_source(options['--source']) if '--source' in options else None
+    limits = {}
+    if '--concurrency' in options:
+        limits['concurrency'] = int(options['--concurrency'])
+    if '--rate' in options:
+        limits['rate'] = float(options['--rate'])
+    ingest_all(args or None, source, **limits)
@@ -0,0 +1,194 @@
+# Request timing histograms in the Prometheus text format, for GET /metrics.
+#
+# Code on the request path marks its stages with `with stage('predict'):`;
+# the timer of the current request (see start_request) adds the elapsed
+# time to that stage. Outside a request stage() costs next to nothing.
+#
+# Under gunicorn every worker has its own counters. With API_METRICS_DIR set
+# (gunicorn.conf.py does), each worker writes a snapshot there at most once
+# per DUMP_INTERVAL and /metrics adds up the snapshots of all workers.
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+METRICS_DIR = os.environ.get('API_METRICS_DIR')
+DUMP_INTERVAL = 1.0
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, help, labelnames):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(labels), value] for labels, value in self._series.items()]
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, help, labelnames, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        # counts[i] holds the observations in (buckets[i - 1], buckets[i]]
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += value
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(labels), list(counts), total] for labels, (counts, total) in self._series.items()]
+
+REQUESTS = Counter('api_requests_total', 'HTTP requests by route and status code.', ('route', 'status'))
+REQUEST_SECONDS = Histogram('api_request_seconds', 'Time spent handling a request.',
+                            ('route', 'asset', 'timeframe'))
+STAGE_SECONDS = Histogram('api_stage_seconds', 'Time spent in each stage of a prediction request.',
+                          ('stage', 'asset', 'timeframe'))
+REGISTRY = [REQUESTS, REQUEST_SECONDS, STAGE_SECONDS]
+
+class RequestTimer:
+    def __init__(self, route):
+        self.route = route
+        self.asset = ''
+        self.timeframe = ''
+        self.stages = {}
+        self.start = time.perf_counter()
+
+_local = threading.local()
+
+def start_request(route):
+    _local.timer = RequestTimer(route or 'unknown')
+
+def current_request():
+    return getattr(_local, 'timer', None)
+
+def label(asset=None, timeframe=None):
+    # Tag the current request; values must come from a small fixed set
+    timer = getattr(_local, 'timer', None)
+    if timer is not None:
+        timer.asset = asset or timer.asset
+        timer.timeframe = timeframe or timer.timeframe
+
+@contextmanager
+def stage(name):
+    timer = getattr(_local, 'timer', None)
+    if timer is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.stages[name] = timer.stages.get(name, 0.0) + time.perf_counter() - start
+
+def finish_request(status):
+    timer = getattr(_local, 'timer', None)
+    if timer is None:
+        return
+    _local.timer = None
+    REQUESTS.inc(timer.route, str(status))
+    REQUEST_SECONDS.observe(time.perf_counter() - timer.start, timer.route, timer.asset, timer.timeframe)
+    for name, seconds in timer.stages.items():
+        STAGE_SECONDS.observe(seconds, name, timer.asset, timer.timeframe)
+    if METRICS_DIR:
+        dump()
+
+_last_dump = 0.0
+# Request threads, and /metrics scrapes, can dump at the same time
+_dump_lock = threading.Lock()
+
+def dump(force=False):
+    # This process's snapshot, for /metrics in any worker to merge
+    global _last_dump
+    with _dump_lock:
+        now = time.monotonic()
+        if not force and now - _last_dump < DUMP_INTERVAL:
+            return
+        _last_dump = now
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        path = os.path.join(METRICS_DIR, f"{os.getpid()}.json")
+        tmp = f"{path}.tmp-{threading.get_ident()}"
+        with open(tmp, 'w') as f:
+            json.dump({metric.name: metric.snapshot() for metric in REGISTRY}, f)
+        os.replace(tmp, path)
+
+def collect():
+    # {metric name: {labels: value or [counts, sum]}} summed over all workers
+    if not METRICS_DIR:
+        snapshots = [{metric.name: metric.snapshot() for metric in REGISTRY}]
+    else:
+        dump(force=True)
+        snapshots = []
+        for name in os.listdir(METRICS_DIR):
+            if name.endswith('.json'):
+                try:
+                    with open(os.path.join(METRICS_DIR, name)) as f:
+                        snapshots.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+
+    merged = {metric.name: {} for metric in REGISTRY}
+    for snapshot in snapshots:
+        for metric in REGISTRY:
+            series = merged[metric.name]
+            for labels, *value in snapshot.get(metric.name, []):
+                labels = tuple(labels)
+                if metric.kind == 'counter':
+                    series[labels] = series.get(labels, 0) + value[0]
+                else:
+                    counts, total = series.get(labels, ([0] * len(value[0]), 0.0))
+                    series[labels] = ([a + b for a, b in zip(counts, value[0])], total + value[1])
+    return merged
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def label_text(names, values, extra=''):
+    pairs = [f'{name}="{escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def render():
+    merged = collect()
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for labels, value in sorted(merged[metric.name].items()):
+            if metric.kind == 'counter':
+                lines.append(f"{metric.name}{label_text(metric.labelnames, labels)} {value}")
+                continue
+            counts, total = value
+            cumulative = 0
+            for bound, count in zip(list(metric.buckets) + ['+Inf'], counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{metric.name}_bucket{label_text(metric.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{metric.name}_sum{label_text(metric.labelnames, labels)} {total}")
+            lines.append(f"{metric.name}_count{label_text(metric.labelnames, labels)} {cumulative}")
+    return '\n'.join(lines) + '\n'
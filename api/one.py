@@ -74,67 +74,100 @@
 # print(forecast_future_date(df, model, user_date))
 
 from flask import Flask, render_template, request
+import sys
+import numpy as np
 import pandas as pd
 from xgboost import XGBRegressor
 from datetime import timedelta
 
+from indicators import IndicatorState, lag, pct_change
+from artifacts import save_artifact, load_artifact
+
 app = Flask(__name__)
 
 # Load and preprocess data
-df = pd.read_csv('bitcoin_last_5_year.csv')
+DATA_FILE = 'bitcoin_last_5_year.csv'
+# Trained with 'python one.py train', loaded from models/btc_recursive/
+ARTIFACT = 'btc_recursive'
+
+df = pd.read_csv(DATA_FILE)
 df['Date'] = pd.to_datetime(df['Date'])
-df['Return'] = df['Close'].pct_change()
-df['Lag_1'] = df['Close'].shift(1)
-df['Lag_2'] = df['Close'].shift(2)
-df['Lag_3'] = df['Close'].shift(3)
+close = df['Close'].to_numpy(dtype='float64')
+df['Return'] = pct_change(close)
+df['Lag_1'] = lag(close, 1)
+df['Lag_2'] = lag(close, 2)
+df['Lag_3'] = lag(close, 3)
 df['SMA_diff'] = df['SMA_20'] - df['SMA_50']
 df.dropna(inplace=True)
 
 features = ['SMA_20', 'SMA_50', 'RSI', 'MACD', 'EMA_12', 'EMA_26',
             'Return', 'Lag_1', 'Lag_2', 'Lag_3', 'SMA_diff']
-X = df[features]
-y = df['Close']
 
 # Train model
-model = XGBRegressor(n_estimators=500, learning_rate=0.05, max_depth=5)
-model.fit(X, y)
+def train_model(df):
+    model = XGBRegressor(n_estimators=500, learning_rate=0.05, max_depth=5)
+    model.fit(df[features], df['Close'])
+    return model
+
+# The server only loads the latest trained artifact
+def load_model():
+    try:
+        model, metadata = load_artifact(ARTIFACT)
+        print(f"Loaded {ARTIFACT} model version {metadata['version']}")
+        return model
+    except FileNotFoundError:
+        print(f"Error: no trained {ARTIFACT} model, run 'python one.py train' first")
+        return None
+
+model = load_model()
+
+# Recursive forecast of every day up to target_date
+def forecast_path(df, model, target_date):
+    current_date = df['Date'].max()
+    horizon = (pd.to_datetime(target_date) - current_date).days
+
+    # Indicators are updated in O(1) per predicted day instead of
+    # recomputing rolling/ewm over the whole history every step
+    state = IndicatorState(df['Close'].to_numpy())
+    # RSI and MACD are carried forward from the last known row
+    rsi = df['RSI'].iloc[-1]
+    macd = df['MACD'].iloc[-1]
+
+    # Preallocated for the whole horizon, columns in the order of `features`
+    X_future = np.empty((horizon, len(features)))
+    closes = np.empty(horizon)
+    for i in range(horizon):
+        X_future[i] = (
+            state.sma(20),
+            state.sma(50),
+            rsi,
+            macd,
+            state.ema(12),
+            state.ema(26),
+            state.pct_return(),
+            state.lag(1),
+            state.lag(2),
+            state.lag(3),
+            state.sma(20) - state.sma(50)
+        )
+        closes[i] = model.predict(X_future[i:i + 1])[0]
+        state.push(closes[i])
+
+    path = pd.DataFrame(X_future, columns=features)
+    path.insert(0, 'Date', pd.date_range(current_date + timedelta(days=1), periods=horizon, freq='D'))
+    path['Close'] = closes
+    return path
 
 # Forecast function
 def forecast_future_date(df, model, target_date):
-    last_known = df.copy()
-    current_date = last_known['Date'].max()
+    current_date = df['Date'].max()
     target_date = pd.to_datetime(target_date)
 
     if target_date <= current_date:
         return f"❌ Date {target_date.date()} is already in dataset. Please enter a future date."
 
-    while current_date < target_date:
-        last_row = last_known.iloc[-1]
-
-        next_date = current_date + timedelta(days=1)
-        row = {
-            'SMA_20': last_known['Close'].rolling(window=20).mean().iloc[-1],
-            'SMA_50': last_known['Close'].rolling(window=50).mean().iloc[-1],
-            'RSI': last_known['RSI'].iloc[-1],
-            'MACD': last_known['MACD'].iloc[-1],
-            'EMA_12': last_known['Close'].ewm(span=12, adjust=False).mean().iloc[-1],
-            'EMA_26': last_known['Close'].ewm(span=26, adjust=False).mean().iloc[-1],
-            'Return': (last_row['Close'] - last_known.iloc[-2]['Close']) / last_known.iloc[-2]['Close'],
-            'Lag_1': last_row['Close'],
-            'Lag_2': last_row['Lag_1'],
-            'Lag_3': last_row['Lag_2'],
-            'SMA_diff': last_known['Close'].rolling(window=20).mean().iloc[-1] - last_known['Close'].rolling(window=50).mean().iloc[-1]
-        }
-
-        X_future = pd.DataFrame([row])
-        pred_close = model.predict(X_future)[0]
-
-        row['Date'] = next_date
-        row['Close'] = pred_close
-        last_known = pd.concat([last_known, pd.DataFrame([row])], ignore_index=True)
-        current_date = next_date
-
-    final_price = last_known[last_known['Date'] == target_date]['Close'].values[0]
+    path = forecast_path(df, model, target_date)
+    final_price = path[path['Date'] == target_date]['Close'].values[0]
     return f"🔮 Predicted Bitcoin Price on {target_date.date()}: ${final_price:.2f}"
 
 # Web Routes
@@ -150,4 +183,15 @@ def index():
     return render_template('index.html', result=result)
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    if sys.argv[1:] == ['train']:
+        version = save_artifact(ARTIFACT, train_model(df), {
+            'data': DATA_FILE,
+            'features': features,
+            'rows': len(df),
+            'last_date': df['Date'].max().strftime('%Y-%m-%d')
+        })
+        print(f"Saved {ARTIFACT} model version {version}")
+    elif model is not None:
+        app.run(debug=True)
+    else:
+        print("Failed to start server due to missing model")
@@ -0,0 +1,228 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+
+from assets import ASSETS, asset_path
+from boosters import load_booster
+import indicators as ind
+from price_store import read_frame
+from metrics import stage
+from encoding import epoch_days
+
+# Upper bound on the number of dates a single bulk request may ask for
+MAX_BULK_DATES = 100000
+
+# Closes the windowed indicators (SMA_50 is the longest) need before a new row
+WARMUP_ROWS = 50
+
+TIMEFRAME_MAP = {
+    '1d': 1,
+    '7d': 7,
+    '30d': 30,
+    '90d': 90
+}
+
+def load_model(asset_id):
+    spec = ASSETS[asset_id]
+    print(f"Loading pre-trained {spec['symbol']} model...")
+    try:
+        model = load_booster(asset_path(spec['model']))
+        print(f"{spec['symbol']} model loaded successfully")
+        return model
+    except FileNotFoundError:
+        print(f"Error: Model file '{spec['model']}' not found")
+        return None
+
+def load_data(asset_id):
+    spec = ASSETS[asset_id]
+    try:
+        # Typed, memory-mapped columns from the price store (see price_store.py)
+        df = read_frame(asset_id)
+
+        # Match EXACT feature names from training (including spaces)
+        df['Day '] = df['Date'].dt.day  # Note the space
+        df['Month '] = df['Date'].dt.month  # Note the space
+        df['Year '] = df['Date'].dt.year  # Note the space
+
+        # Technical indicators, computed on the raw close array
+        close = df['Close'].to_numpy(dtype='float64')
+        df['Return'] = ind.pct_change(close)
+        df['Lag_1'] = ind.lag(close, 1)
+        df['Lag_2'] = ind.lag(close, 2)
+        df['Lag_3'] = ind.lag(close, 3)
+        df['SMA_20'] = ind.sma(close, 20)
+        df['SMA_50'] = ind.sma(close, 50)
+
+        # Optional per-asset indicators from the registry
+        if 'SMA_diff' in spec['indicators']:
+            df['SMA_diff'] = df['SMA_20'] - df['SMA_50']
+        if 'RSI' in spec['indicators']:
+            df['RSI'] = ind.rsi(close)
+        if 'MACD' in spec['indicators']:
+            df['MACD'] = ind.macd(close)
+        if 'EMA_12' in spec['indicators']:
+            df['EMA_12'] = ind.ema(close, 12)
+        if 'EMA_26' in spec['indicators']:
+            df['EMA_26'] = ind.ema(close, 26)
+
+        df.dropna(inplace=True)
+        return df
+    except Exception as e:
+        print(f"Error loading {spec['symbol']} data: {str(e)}")
+        return None
+
+def ema_state(close):
+    # EMA values at the last close, kept so extend_features() can continue
+    # the recursions instead of starting again from the first row
+    fast, slow = ind.ema(close, 12), ind.ema(close, 26)
+    return {
+        'EMA_12': float(fast[-1]),
+        'EMA_26': float(slow[-1]),
+        'MACD_signal': float(ind.ema(fast - slow, 9)[-1]),
+    }
+
+def extend_features(asset_id, columns, new_rows, state):
+    """Features of the last new_rows rows of an asset's store columns.
+
+    Returns (columns, state) with the same values load_data() gives for those
+    rows on the full history: the windowed indicators only look at the
+    WARMUP_ROWS closes before them and the EMAs continue from ``state``, the
+    ema_state() of the rows before.
+    """
+    spec = ASSETS[asset_id]
+    close = np.asarray(columns['Close'][-(new_rows + WARMUP_ROWS):], dtype='float64')
+    new_close = close[-new_rows:]
+    dates = pd.DatetimeIndex(columns['Date'][-new_rows:])
+
+    out = {name: np.asarray(columns[name][-new_rows:]) for name in ('Date', 'Open', 'High', 'Low', 'Close', 'Volume')}
+    out['Day '] = dates.day.to_numpy('float64')
+    out['Month '] = dates.month.to_numpy('float64')
+    out['Year '] = dates.year.to_numpy('float64')
+    out['Return'] = ind.pct_change(close)[-new_rows:]
+    out['Lag_1'] = ind.lag(close, 1)[-new_rows:]
+    out['Lag_2'] = ind.lag(close, 2)[-new_rows:]
+    out['Lag_3'] = ind.lag(close, 3)[-new_rows:]
+    out['SMA_20'] = ind.sma(close, 20)[-new_rows:]
+    out['SMA_50'] = ind.sma(close, 50)[-new_rows:]
+
+    fast = ind.ema(new_close, 12, initial=state['EMA_12'])
+    slow = ind.ema(new_close, 26, initial=state['EMA_26'])
+    signal = ind.ema(fast - slow, 9, initial=state['MACD_signal'])
+    if 'SMA_diff' in spec['indicators']:
+        out['SMA_diff'] = out['SMA_20'] - out['SMA_50']
+    if 'RSI' in spec['indicators']:
+        out['RSI'] = ind.rsi(close)[-new_rows:]
+    if 'MACD' in spec['indicators']:
+        out['MACD'] = (fast - slow) - signal
+    if 'EMA_12' in spec['indicators']:
+        out['EMA_12'] = fast
+    if 'EMA_26' in spec['indicators']:
+        out['EMA_26'] = slow
+
+    state = {'EMA_12': float(fast[-1]), 'EMA_26': float(slow[-1]), 'MACD_signal': float(signal[-1])}
+    return out, state
+
+def date_features(dates):
+    # Match EXACT feature names from training (including spaces)
+    dates = pd.DatetimeIndex(dates)
+    return pd.DataFrame({
+        'Day ': dates.day.astype('int64'),      # Note the space
+        'Month ': dates.month.astype('int64'),  # Note the space
+        'Year ': dates.year.astype('int64')     # Note the space
+    })
+
+def forecast_future(df, model, days_to_predict, columnar=False):
+    # df is a DataFrame or the arena's column views (see arena.py);
+    # columnar=True returns the chart series as arrays (see forecast_columns)
+    dates = np.asarray(df['Date'])
+    closes = np.asarray(df['Close'])
+    current_date = pd.Timestamp(dates.max())
+
+    # The features only depend on the date, so the whole horizon is
+    # known up front and can be predicted in a single call
+    with stage('features'):
+        future_dates = pd.date_range(current_date + timedelta(days=1), periods=days_to_predict, freq='D')
+        X = date_features(future_dates)
+    with stage('predict'):
+        future_prices = model.predict(X)
+
+    with stage('chart_data'):
+        if columnar:
+            return forecast_columns(dates, closes, future_dates, future_prices, days_to_predict)
+        return forecast_result(dates, closes, future_dates, future_prices, days_to_predict)
+
+def forecast_result(dates, closes, future_dates, future_prices, days_to_predict):
+    predictions = [
+        {'date': d, 'price': float(p)}
+        for d, p in zip(future_dates.strftime('%Y-%m-%d'), future_prices)
+    ]
+
+    chart_data = {
+        'historical': {
+            'dates': pd.DatetimeIndex(dates[-30:]).strftime('%Y-%m-%d').tolist(),
+            'prices': [float(p) for p in closes[-30:]]
+        },
+        'predictions': {
+            'dates': [p['date'] for p in predictions],
+            'prices': [p['price'] for p in predictions]
+        }
+    }
+
+    return {
+        'prediction': predictions[-1],
+        'chart_data': chart_data,
+        'timeframe': f"{days_to_predict} days"
+    }
+
+def forecast_columns(dates, closes, future_dates, future_prices, days_to_predict):
+    # forecast_result with the chart series as NumPy arrays and dates as
+    # days since 1970-01-01, for the columnar encodings in encoding.py
+    return {
+        'prediction': {'date': future_dates[-1].strftime('%Y-%m-%d'), 'price': float(future_prices[-1])},
+        'chart_data': {
+            'historical': {
+                'days': epoch_days(dates[-30:]),
+                'prices': np.ascontiguousarray(closes[-30:], dtype='float64')
+            },
+            'predictions': {
+                'days': epoch_days(future_dates),
+                'prices': np.ascontiguousarray(future_prices, dtype='float32')
+            }
+        },
+        'timeframe': f"{days_to_predict} days"
+    }
+
+def predict_date(model, date_str):
+    with stage('features'):
+        date_obj = datetime.strptime(date_str, "%Y-%m-%d")
+        X = date_features([date_obj])
+    with stage('predict'):
+        prediction = model.predict(X)[0]
+    return {
+        "date": date_str,
+        "predicted_price": float(f"{prediction:.10f}"),
+        "predicted_price_scientific": f"{prediction:.4e}",
+        "success": True
+    }
+
+def parse_dates(data):
+    # Either an explicit list of dates or an inclusive start/end range
+    if 'dates' in data:
+        dates = pd.DatetimeIndex(pd.to_datetime(data['dates'], format='%Y-%m-%d'))
+    elif 'start' in data and 'end' in data:
+        dates = pd.date_range(pd.to_datetime(data['start'], format='%Y-%m-%d'),
+                              pd.to_datetime(data['end'], format='%Y-%m-%d'), freq='D')
+    else:
+        raise ValueError("Provide either 'dates' or both 'start' and 'end'")
+    if len(dates) == 0:
+        raise ValueError("No dates requested")
+    if len(dates) > MAX_BULK_DATES:
+        raise ValueError(f"Too many dates requested ({len(dates)} > {MAX_BULK_DATES})")
+    return dates
+
+def predict_dates(model, dates):
+    # One vectorized model.predict call for any number of dates
+    with stage('features'):
+        X = date_features(dates)
+    with stage('predict'):
+        return model.predict(X)
@@ -0,0 +1,144 @@
+# Columnar price store: one directory of .npy column files per asset,
+# memory-mapped read-only so loading is parse-free and worker processes
+# share the same page-cache pages.
+#
+# Layout: store/<asset>/<version>/{Date,Open,High,Low,Close,Volume}.npy
+#         store/<asset>/<version>/meta.json
+#         store/<asset>/CURRENT  (name of the version to read)
+#
+# Build or refresh it from the CSVs with: python price_store.py [asset ...]
+# New candles are appended by ingest.py.
+import json
+import os
+import shutil
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from assets import ASSETS, BASE_DIR, asset_path
+
+STORE_DIR = os.path.join(BASE_DIR, 'store')
+
+COLUMNS = {
+    'Date': 'datetime64[D]',
+    'Open': 'float64',
+    'High': 'float64',
+    'Low': 'float64',
+    'Close': 'float64',
+    'Volume': 'int64',
+}
+
+# Older versions kept around for readers that still have them mapped
+KEEP_VERSIONS = 2
+
+def store_dir(asset_id):
+    return os.path.join(STORE_DIR, asset_id)
+
+def current_version(asset_id):
+    try:
+        with open(os.path.join(store_dir(asset_id), 'CURRENT')) as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+def read_price_csv(path):
+    # Handles the flat 'Date,Ticker,Open,...' files as well as raw yfinance
+    # exports, which have 'Price'/'Ticker'/'Date' header rows
+    df = pd.read_csv(path)
+    if df.columns[0] == 'Price':
+        df = pd.read_csv(path, header=0, skiprows=[1, 2]).rename(columns={'Price': 'Date'})
+    df['Date'] = pd.to_datetime(df['Date'])
+    df = df.sort_values('Date').drop_duplicates('Date', keep='last')
+    return df[list(COLUMNS)].reset_index(drop=True)
+
+def write_store(asset_id, df, source=None, base_version=None, appended=None):
+    # Each write is a complete new version; CURRENT is switched last, so
+    # readers see either the old or the new columns, never a mix
+    version = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')
+    directory = os.path.join(store_dir(asset_id), version)
+    os.makedirs(directory)
+
+    for name, dtype in COLUMNS.items():
+        values = df[name].to_numpy().astype(dtype)
+        np.save(os.path.join(directory, f"{name}.npy"), values)
+    meta = {
+        'asset': asset_id,
+        'version': version,
+        'rows': len(df),
+        'first_date': str(df['Date'].min().date()) if len(df) else None,
+        'last_date': str(df['Date'].max().date()) if len(df) else None,
+        'source': source,
+        # Set when this version is base_version plus `appended` new rows
+        'base_version': base_version,
+        'appended': appended,
+    }
+    with open(os.path.join(directory, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    tmp = os.path.join(store_dir(asset_id), f"CURRENT.tmp-{os.getpid()}")
+    with open(tmp, 'w') as f:
+        f.write(version)
+    os.replace(tmp, os.path.join(store_dir(asset_id), 'CURRENT'))
+    prune_versions(asset_id)
+    return version
+
+def prune_versions(asset_id):
+    versions = sorted(
+        name for name in os.listdir(store_dir(asset_id))
+        if os.path.isdir(os.path.join(store_dir(asset_id), name))
+    )
+    for name in versions[:-KEEP_VERSIONS]:
+        shutil.rmtree(os.path.join(store_dir(asset_id), name), ignore_errors=True)
+
+def read_columns(asset_id, version=None):
+    # Memory-mapped, read-only column arrays; nothing is parsed or copied
+    version = version or current_version(asset_id)
+    if version is None:
+        raise FileNotFoundError(f"No price store for '{asset_id}', run 'python price_store.py {asset_id}'")
+    directory = os.path.join(store_dir(asset_id), version)
+    return {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r') for name in COLUMNS}
+
+def read_frame(asset_id, version=None):
+    return pd.DataFrame(read_columns(asset_id, version))
+
+def read_meta(asset_id, version=None):
+    version = version or current_version(asset_id)
+    with open(os.path.join(store_dir(asset_id), version, 'meta.json')) as f:
+        return json.load(f)
+
+def append_store(asset_id, rows, source=None):
+    # Appends the rows dated after the last stored candle as a new version.
+    # Returns (version, number of rows appended); version is None when
+    # there was nothing new.
+    base_version = current_version(asset_id)
+    if base_version is None:
+        raise FileNotFoundError(f"No price store for '{asset_id}', run 'python price_store.py {asset_id}'")
+    columns = read_columns(asset_id, base_version)
+    last_date = columns['Date'][-1] if len(columns['Date']) else None
+
+    rows = rows.sort_values('Date').drop_duplicates('Date', keep='last')
+    if last_date is not None:
+        rows = rows[rows['Date'].to_numpy().astype('datetime64[D]') > last_date]
+    if rows.empty:
+        return None, 0
+
+    df = pd.DataFrame({
+        name: np.concatenate([columns[name], rows[name].to_numpy().astype(dtype)])
+        for name, dtype in COLUMNS.items()
+    })
+    df['Date'] = pd.to_datetime(df['Date'])
+    version = write_store(asset_id, df, source=source, base_version=base_version, appended=len(rows))
+    return version, len(rows)
+
+def ingest_csv(asset_id):
+    source = ASSETS[asset_id]['data']
+    df = read_price_csv(asset_path(source))
+    version = write_store(asset_id, df, source=source)
+    print(f"{asset_id}: {len(df)} rows from {source} -> store version {version}")
+    return version
+
+if __name__ == '__main__':
+    for asset_id in sys.argv[1:] or list(ASSETS):
+        ingest_csv(asset_id)
@@ -0,0 +1,108 @@
+# Opt-in cProfile traces of prediction requests.
+#
+# A request is profiled when it is sampled (API_PROFILE_RATE, a fraction
+# between 0 and 1, default 0 = off) or when an admin sends `X-Profile: 1`.
+# Traces of requests faster than API_PROFILE_SLOW_MS are dropped, so a low
+# threshold catches everything and a high one only pathological requests.
+# They are written to API_PROFILE_DIR (default api/profiles/) as
+# <id>.prof (open with `python -m pstats` or snakeviz) plus <id>.json;
+# index.json lists the kept traces, newest first, and only the last
+# API_PROFILE_KEEP are kept.
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import threading
+import time
+from datetime import datetime, timezone
+
+from assets import BASE_DIR
+
+PROFILE_RATE = float(os.environ.get('API_PROFILE_RATE', 0))
+PROFILE_DIR = os.environ.get('API_PROFILE_DIR', os.path.join(BASE_DIR, 'profiles'))
+PROFILE_KEEP = int(os.environ.get('API_PROFILE_KEEP', 100))
+PROFILE_SLOW_MS = float(os.environ.get('API_PROFILE_SLOW_MS', 0))
+PROFILE_HEADER = 'X-Profile'
+# Functions listed in each trace's index entry
+TOP_FUNCTIONS = 10
+
+# Only one profiler can be active at a time, so concurrent requests in
+# other threads are simply not profiled
+_busy = threading.Lock()
+
+class RequestProfile:
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        self.done = False
+        self.start = time.perf_counter()
+        self.profiler.enable()
+
+    def finish(self, **info):
+        # Stops profiling; returns the trace id, or None if it wasn't kept
+        if self.done:
+            return None
+        self.done = True
+        self.profiler.disable()
+        # Held until the trace is saved, so no two threads rotate at once
+        try:
+            duration_ms = (time.perf_counter() - self.start) * 1e3
+            if duration_ms < PROFILE_SLOW_MS:
+                return None
+            profile_id = f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')}-{os.getpid()}"
+            save_trace(profile_id, self.profiler, dict(info, id=profile_id, duration_ms=duration_ms))
+            return profile_id
+        finally:
+            _busy.release()
+
+def start(forced=False):
+    # A RequestProfile when this request should be profiled, else None
+    if not forced and (PROFILE_RATE <= 0 or random.random() >= PROFILE_RATE):
+        return None
+    if not _busy.acquire(blocking=False):
+        return None
+    return RequestProfile()
+
+def top_functions(profiler, n=TOP_FUNCTIONS):
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:n]
+    return [
+        {'function': f"{os.path.basename(filename)}:{line}({name})", 'calls': nc, 'cumulative_ms': ct * 1e3}
+        for (filename, line, name), (cc, nc, tt, ct, callers) in rows
+    ]
+
+def save_trace(profile_id, profiler, info):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profiler.dump_stats(os.path.join(PROFILE_DIR, f"{profile_id}.prof"))
+    info['top'] = top_functions(profiler)
+    path = os.path.join(PROFILE_DIR, f"{profile_id}.json")
+    with open(f"{path}.tmp", 'w') as f:
+        json.dump(info, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+    rotate()
+
+def rotate():
+    # Drop the oldest traces and rebuild the index from what is left; every
+    # trace has its own .json, so workers writing at once can't lose entries
+    ids = sorted((name[:-5] for name in os.listdir(PROFILE_DIR)
+                  if name.endswith('.json') and name != 'index.json'), reverse=True)
+    for profile_id in ids[PROFILE_KEEP:]:
+        for ext in ('.prof', '.json'):
+            try:
+                os.remove(os.path.join(PROFILE_DIR, profile_id + ext))
+            except FileNotFoundError:
+                pass
+
+    entries = []
+    for profile_id in ids[:PROFILE_KEEP]:
+        try:
+            with open(os.path.join(PROFILE_DIR, f"{profile_id}.json")) as f:
+                info = json.load(f)
+        except (OSError, ValueError):
+            continue
+        entries.append({key: value for key, value in info.items() if key != 'top'})
+    tmp = os.path.join(PROFILE_DIR, f"index.json.tmp-{os.getpid()}-{threading.get_ident()}")
+    with open(tmp, 'w') as f:
+        json.dump(entries, f, indent=2)
+    os.replace(tmp, os.path.join(PROFILE_DIR, 'index.json'))
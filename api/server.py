@@ -0,0 +1,324 @@
+from flask import Flask, Response, g, request, jsonify
+import json
+import os
+import numpy as np
+from flask_cors import CORS
+
+from assets import ASSETS, resolve_asset
+from predictor import TIMEFRAME_MAP, load_model, predict_date, parse_dates, predict_dates
+from arena import load_history
+from forecast_cache import ForecastCache, asset_version
+from encoding import JSON, negotiate, encode, encode_forecast_response, epoch_days
+import metrics
+import profiling
+from metrics import stage
+from downsample import downsample, parse_width
+
+DEFAULT_PORT = 5480
+# Tags every prediction response with the model/data version that produced it
+VERSION_HEADER = 'X-Model-Version'
+# Required in the X-Admin-Token header of admin requests; without it admin
+# routes only answer requests from this machine
+ADMIN_TOKEN = os.environ.get('API_ADMIN_TOKEN')
+# Points returned by /history when the request doesn't give a pixel width
+DEFAULT_HISTORY_WIDTH = 800
+# Routes that may be profiled (see profiling.py)
+PROFILED_ENDPOINTS = ('predict', 'predict_bulk')
+# Number of JSON lines sent per chunk when streaming bulk predictions
+STREAM_CHUNK_LINES = 1000
+
+def encoded_response(obj, mimetype):
+    # A columnar (see encoding.py) response; they all vary with Accept
+    return Response(encode(obj, mimetype), mimetype=mimetype, headers={'Vary': 'Accept'})
+
+def is_admin(request):
+    if ADMIN_TOKEN is not None:
+        return request.headers.get('X-Admin-Token') == ADMIN_TOKEN
+    return request.remote_addr in ('127.0.0.1', '::1')
+
+def load_assets(asset_ids):
+    # Load every model and dataset once for the whole process
+    loaded = {}
+    for asset_id in asset_ids:
+        model = load_model(asset_id)
+        df = load_history(asset_id)
+        if model is None or df is None:
+            print(f"Skipping {ASSETS[asset_id]['ticker']}: missing model or data file")
+            continue
+        loaded[asset_id] = {'model': model, 'df': df, 'version': asset_version(asset_id)}
+    return loaded
+
+def create_app(asset_ids=None):
+    asset_ids = list(asset_ids or ASSETS.keys())
+    app = Flask(__name__)
+    CORS(app, expose_headers=[VERSION_HEADER])
+
+    app.config['ASSETS'] = load_assets(asset_ids)
+    # Timeframe forecasts only change with the model/data files, so serve them pre-encoded
+    cache = ForecastCache(app.config['ASSETS'])
+    cache.warm()
+    app.config['FORECAST_CACHE'] = cache
+    # Requests without a 'crypto' field fall back to the first served asset
+    default_asset = asset_ids[0]
+
+    @app.before_request
+    def start_timer():
+        metrics.start_request(request.endpoint)
+
+    @app.after_request
+    def record_timing(response):
+        metrics.finish_request(response.status_code)
+        return response
+
+    @app.before_request
+    def start_profile():
+        if request.endpoint in PROFILED_ENDPOINTS:
+            forced = request.headers.get(profiling.PROFILE_HEADER) == '1' and is_admin(request)
+            g.profile = profiling.start(forced)
+
+    @app.after_request
+    def save_profile(response):
+        # Registered after record_timing, so it runs first and still sees the labels
+        profile = g.pop('profile', None)
+        if profile is not None:
+            timer = metrics.current_request()
+            profile_id = profile.finish(
+                route=request.endpoint,
+                asset=timer.asset if timer else '',
+                timeframe=timer.timeframe if timer else '',
+                status=response.status_code,
+                request_bytes=request.content_length or 0,
+            )
+            if profile_id:
+                response.headers['X-Profile-Id'] = profile_id
+        return response
+
+    @app.teardown_request
+    def stop_profile(exc):
+        # Requests that failed before after_request still release the profiler
+        profile = g.pop('profile', None)
+        if profile is not None:
+            profile.finish(route=request.endpoint, status=500)
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics_endpoint():
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+    def pick_asset(crypto):
+        # Single-asset (legacy per-coin) apps ignore the 'crypto' field like before
+        if len(asset_ids) == 1 or crypto is None:
+            return default_asset
+        return resolve_asset(crypto)
+
+    @app.route('/assets', methods=['GET'])
+    def assets():
+        return jsonify({
+            'success': True,
+            'assets': [
+                {'id': asset_id, 'symbol': ASSETS[asset_id]['symbol'], 'ticker': ASSETS[asset_id]['ticker'],
+                 'version': loaded['version']}
+                for asset_id, loaded in app.config['ASSETS'].items()
+            ]
+        })
+
+    @app.route('/predict', methods=['POST'])
+    def predict():
+        try:
+            with stage('parse'):
+                data = request.json
+                crypto = data.get('crypto', ASSETS[default_asset]['ticker'])
+                timeframe = data.get('timeframe', '7d')
+                days_to_predict = TIMEFRAME_MAP.get(timeframe, 7)
+                asset_id = pick_asset(data.get('crypto'))
+                mimetype = negotiate(request.accept_mimetypes)
+            metrics.label(asset_id if asset_id in app.config['ASSETS'] else None,
+                          'date' if 'date' in data else f"{days_to_predict}d")
+            if asset_id not in app.config['ASSETS']:
+                return jsonify({
+                    'success': False,
+                    'error': f"Unknown or unavailable crypto '{crypto}'"
+                }), 404
+            cache.check(asset_id)
+            loaded = app.config['ASSETS'][asset_id]
+
+            if 'date' in data:
+                result = predict_date(loaded['model'], data.get('date'))
+                with stage('serialize'):
+                    response = jsonify(result)
+            else:
+                # Cache hits skip the features/predict/chart_data stages
+                with stage('forecast'):
+                    result = cache.get(asset_id, days_to_predict, check=False, loaded=loaded, mimetype=mimetype)
+                with stage('serialize'):
+                    response = Response(encode_forecast_response(crypto, timeframe, result, mimetype),
+                                        mimetype=mimetype, headers={'Vary': 'Accept'})
+            response.headers[VERSION_HEADER] = loaded['version']
+            return response
+        except Exception as e:
+            app.logger.exception("Prediction failed")
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 500
+
+    @app.route('/history', methods=['GET'])
+    def history():
+        # Closing prices of the whole (or the last `days` of the) stored
+        # history, downsampled to about one point per pixel of `width`
+        crypto = request.args.get('crypto')
+        asset_id = pick_asset(crypto)
+        metrics.label(asset_id if asset_id in app.config['ASSETS'] else None, 'history')
+        if asset_id not in app.config['ASSETS']:
+            return jsonify({
+                'success': False,
+                'error': f"Unknown or unavailable crypto '{crypto}'"
+            }), 404
+        try:
+            width = parse_width(request.args.get('width'), DEFAULT_HISTORY_WIDTH)
+            days = int(request.args['days']) if request.args.get('days') else None
+            method = request.args.get('method', 'lttb')
+            if method not in ('lttb', 'minmax'):
+                raise ValueError(f"Unknown downsampling method '{method}'")
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        loaded = app.config['ASSETS'][asset_id]
+        dates = np.asarray(loaded['df']['Date']).astype('datetime64[D]')
+        closes = np.asarray(loaded['df']['Close'], dtype='float64')
+        if days:
+            start = np.searchsorted(dates, dates[-1] - np.timedelta64(days - 1, 'D'))
+            dates, closes = dates[start:], closes[start:]
+        with stage('downsample'):
+            keep = downsample(dates.astype('int64'), closes, width, method)
+        mimetype = negotiate(request.accept_mimetypes)
+        if mimetype != JSON:
+            response = encoded_response({
+                'success': True,
+                'crypto': ASSETS[asset_id]['ticker'],
+                'days': epoch_days(dates[keep]),
+                'prices': closes[keep],
+                'total': len(closes)
+            }, mimetype)
+            response.headers[VERSION_HEADER] = loaded['version']
+            return response
+        response = jsonify({
+            'success': True,
+            'crypto': ASSETS[asset_id]['ticker'],
+            'dates': dates[keep].astype(str).tolist(),
+            'prices': closes[keep].tolist(),
+            'total': len(closes)
+        })
+        response.headers[VERSION_HEADER] = loaded['version']
+        return response
+
+    @app.route('/predict/bulk', methods=['POST'])
+    def predict_bulk():
+        metrics.label(timeframe='bulk')
+        try:
+            with stage('parse'):
+                data = request.json
+                try:
+                    dates = parse_dates(data)
+                except ValueError as e:
+                    return jsonify({'success': False, 'error': str(e)}), 400
+
+            selected, versions = {}, {}
+            for crypto in data.get('cryptos') or [data.get('crypto')]:
+                asset_id = pick_asset(crypto)
+                crypto = crypto or ASSETS[default_asset]['ticker']
+                if asset_id not in app.config['ASSETS']:
+                    return jsonify({
+                        'success': False,
+                        'error': f"Unknown or unavailable crypto '{crypto}'"
+                    }), 404
+                cache.check(asset_id)
+                loaded = app.config['ASSETS'][asset_id]
+                selected[crypto] = loaded['model']
+                versions[crypto] = loaded['version']
+
+            version_tag = ', '.join(f"{crypto}={version}" for crypto, version in versions.items())
+            mimetype = negotiate(request.accept_mimetypes)
+            if mimetype != JSON and not data.get('stream'):
+                # Arrays all the way: no date strings, no Python floats
+                predictions = {crypto: predict_dates(model, dates) for crypto, model in selected.items()}
+                with stage('serialize'):
+                    response = encoded_response({
+                        'success': True,
+                        'days': epoch_days(dates),
+                        'predictions': predictions
+                    }, mimetype)
+                response.headers[VERSION_HEADER] = version_tag
+                return response
+
+            with stage('features'):
+                date_strs = dates.strftime('%Y-%m-%d').tolist()
+            predictions = {crypto: predict_dates(model, dates).tolist() for crypto, model in selected.items()}
+
+            if data.get('stream') or request.accept_mimetypes.best == 'application/x-ndjson':
+                def generate():
+                    # One JSON object per line, sent in chunks for large ranges
+                    for crypto, prices in predictions.items():
+                        for i in range(0, len(date_strs), STREAM_CHUNK_LINES):
+                            yield ''.join(
+                                json.dumps({'crypto': crypto, 'date': d, 'predicted_price': p}) + '\n'
+                                for d, p in zip(date_strs[i:i + STREAM_CHUNK_LINES], prices[i:i + STREAM_CHUNK_LINES])
+                            )
+                return Response(generate(), mimetype='application/x-ndjson',
+                                headers={VERSION_HEADER: version_tag})
+
+            with stage('serialize'):
+                response = jsonify({
+                    'success': True,
+                    'dates': date_strs,
+                    'predictions': predictions
+                })
+            response.headers[VERSION_HEADER] = version_tag
+            return response
+        except Exception as e:
+            app.logger.exception("Bulk prediction failed")
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 500
+
+    @app.route('/admin/reload', methods=['POST'])
+    def admin_reload():
+        # Load, validate and swap in new model/data files now instead of
+        # waiting for the watcher; other requests are served meanwhile
+        if not is_admin(request):
+            return jsonify({'success': False, 'error': 'Forbidden'}), 403
+
+        data = request.get_json(silent=True) or {}
+        if data.get('crypto'):
+            asset_id = pick_asset(data['crypto'])
+            if asset_id not in app.config['ASSETS']:
+                return jsonify({
+                    'success': False,
+                    'error': f"Unknown or unavailable crypto '{data['crypto']}'"
+                }), 404
+            asset_ids = [asset_id]
+        else:
+            asset_ids = list(app.config['ASSETS'])
+
+        results = {}
+        for asset_id in asset_ids:
+            ok = cache.reload(asset_id)
+            results[asset_id] = {'reloaded': ok, 'version': app.config['ASSETS'][asset_id]['version']}
+        return jsonify({
+            'success': all(result['reloaded'] for result in results.values()),
+            'assets': results
+        })
+
+    return app
+
+def serve(app, port):
+    if app.config['ASSETS']:
+        tickers = ', '.join(ASSETS[asset_id]['ticker'] for asset_id in app.config['ASSETS'])
+        print(f"Starting {tickers} Prediction API...")
+        app.config['FORECAST_CACHE'].start_watcher()
+        app.run(host='0.0.0.0', port=port, debug=True)
+    else:
+        print("Failed to start server due to missing model or data file")
+
+if __name__ == '__main__':
+    serve(create_app(), DEFAULT_PORT)
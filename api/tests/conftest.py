@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+# The api/ modules import each other by their bare names
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import arena
+import price_store
+from assets import ASSETS
+
+def use_store(monkeypatch, directory):
+    # Points the price store and the arena at directory
+    monkeypatch.setattr(price_store, 'STORE_DIR', str(directory))
+    monkeypatch.setattr(arena, 'ARENA_DIR', os.path.join(str(directory), 'arena'))
+    monkeypatch.setattr(arena, '_attached', None)
+
+@pytest.fixture(scope='session')
+def store(tmp_path_factory):
+    # The store is generated, not tracked: build one from the registry CSVs
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        use_store(monkeypatch, tmp_path_factory.mktemp('store'))
+        for asset_id in ASSETS:
+            price_store.ingest_csv(asset_id)
+        arena.build_arena()
+        yield price_store.STORE_DIR
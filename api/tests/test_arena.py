@@ -0,0 +1,39 @@
+import numpy as np
+
+import arena
+import price_store
+from assets import ASSETS, asset_path
+from fetcher import FixtureSource
+from ingest import ingest_all
+from predictor import load_data
+
+from conftest import use_store
+
+NEW_ROWS = 30
+
+def no_rebuild(asset_id):
+    raise AssertionError(f"{asset_id} was rebuilt instead of extended")
+
+def test_appended_rows_extend_the_arena(tmp_path, monkeypatch):
+    use_store(monkeypatch, tmp_path)
+    for asset_id, spec in ASSETS.items():
+        df = price_store.read_price_csv(asset_path(spec['data']))
+        price_store.write_store(asset_id, df.iloc[:-NEW_ROWS], source=spec['data'])
+    arena.build_arena()
+
+    # The rest of every CSV comes in through the fixture source, as a
+    # scheduled ingest would append it
+    monkeypatch.setattr(arena, 'load_data', no_rebuild)
+    assert ingest_all(source=FixtureSource()) == list(ASSETS)
+
+    built = arena.attach_arena()
+    for asset_id in ASSETS:
+        assert price_store.read_meta(asset_id)['appended'] == NEW_ROWS
+        columns = built.columns(asset_id)
+        expected = load_data(asset_id)
+        np.testing.assert_array_equal(columns['Date'], expected['Date'].to_numpy().astype('datetime64[D]'))
+        assert set(columns) - {'Date'} == set(expected.columns) & set(arena.FIELDS)
+        for name in columns:
+            if name != 'Date':
+                np.testing.assert_allclose(columns[name], expected[name].to_numpy('float64'),
+                                           rtol=1e-12, err_msg=f"{asset_id} {name}")
@@ -0,0 +1,56 @@
+import asyncio
+import json
+
+import pandas as pd
+import pytest
+
+from asgi_bridge import AsgiBridge
+from server import STREAM_CHUNK_LINES, create_app
+
+@pytest.fixture(scope='module')
+def flask_app(store):
+    return create_app(['bitcoin'])
+
+def call(app, method, path, body=b''):
+    # Runs one request through the ASGI app and returns the messages it sent
+    requests = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    messages = []
+
+    async def receive():
+        return requests.pop(0)
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        'type': 'http', 'method': method, 'path': path, 'query_string': b'',
+        'http_version': '1.1', 'headers': [(b'content-type', b'application/json')],
+        'client': ('127.0.0.1', 50000), 'server': ('127.0.0.1', 5480),
+    }
+    asyncio.run(app(scope, receive, send))
+    return messages
+
+@pytest.mark.parametrize('lane', ['loop', 'cpu'])
+def test_streamed_bulk_is_sent_in_chunks(flask_app, lane):
+    app = AsgiBridge(flask_app, {'predict_bulk': {'lane': lane, 'limit': 1, 'queue': 0}})
+    days = 2 * STREAM_CHUNK_LINES + 500
+    end = pd.Timestamp('2025-01-01') + pd.Timedelta(days=days - 1)
+    body = json.dumps({'crypto': 'BTC-USD', 'start': '2025-01-01', 'end': str(end.date()), 'stream': True})
+    messages = call(app, 'POST', '/predict/bulk', body.encode())
+
+    assert messages[0]['type'] == 'http.response.start'
+    assert messages[0]['status'] == 200
+    chunks = [m for m in messages[1:] if m.get('more_body')]
+    assert len(chunks) == 3
+    assert messages[-1] == {'type': 'http.response.body', 'body': b''}
+    lines = b''.join(m['body'] for m in messages[1:]).splitlines()
+    assert len(lines) == days
+    assert json.loads(lines[0])['date'] == '2025-01-01'
+
+def test_plain_response_matches_flask(flask_app):
+    app = AsgiBridge(flask_app, {'predict': {'lane': 'loop'}})
+    body = json.dumps({'crypto': 'BTC-USD', 'timeframe': '7d'}).encode()
+    messages = call(app, 'POST', '/predict', body)
+    expected = flask_app.test_client().post('/predict', data=body, content_type='application/json')
+    assert messages[0]['status'] == 200
+    assert b''.join(m['body'] for m in messages[1:]) == expected.data
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import indicators as ind
+from assets import ASSETS, asset_path
+from price_store import read_price_csv
+
+def closes(asset_id):
+    return read_price_csv(asset_path(ASSETS[asset_id]['data']))['Close']
+
+def assert_matches(actual, expected):
+    np.testing.assert_allclose(actual, np.asarray(expected, dtype='float64'), rtol=1e-9, atol=1e-9)
+
+@pytest.mark.parametrize('asset_id', list(ASSETS))
+def test_batch_indicators_match_pandas(asset_id):
+    close = closes(asset_id)
+    for window in (7, 20, 50):
+        assert_matches(ind.sma(close, window), close.rolling(window).mean())
+    for span in (12, 26):
+        assert_matches(ind.ema(close, span), close.ewm(span=span, adjust=False).mean())
+        assert_matches(ind.ema(close, span, min_periods=span),
+                       close.ewm(span=span, adjust=False, min_periods=span).mean())
+    for k in (1, 2, 4):
+        assert_matches(ind.lag(close, k), close.shift(k))
+    assert_matches(ind.pct_change(close), close.pct_change())
+
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0).rolling(14).mean()
+    loss = -delta.where(delta < 0, 0).rolling(14).mean()
+    assert_matches(ind.rsi(close, 14), 100 - (100 / (1 + gain / loss)))
+
+@pytest.mark.parametrize('asset_id', list(ASSETS))
+def test_batch_indicators_match_ta(asset_id):
+    ta = pytest.importorskip('ta')
+    close = closes(asset_id)
+    assert_matches(ind.rsi(close, 14, smoothing='wilder'),
+                   ta.momentum.RSIIndicator(close, window=14).rsi())
+    assert_matches(ind.macd(close, min_periods=True), ta.trend.MACD(close).macd_diff())
+
+@pytest.mark.parametrize('asset_id', list(ASSETS))
+def test_indicator_state_follows_batch(asset_id):
+    close = closes(asset_id).to_numpy()
+    seed = len(close) - 100
+    state = ind.IndicatorState(close[:seed])
+    sma20, sma50 = ind.sma(close, 20), ind.sma(close, 50)
+    ema12, ema26 = ind.ema(close, 12), ind.ema(close, 26)
+    lags = {k: ind.lag(close, k - 1) for k in (1, 2, 4)}
+    change = ind.pct_change(close)
+    for i in range(seed, len(close) + 1):
+        t = i - 1
+        assert_matches(state.sma(20), sma20[t])
+        assert_matches(state.sma(50), sma50[t])
+        assert_matches(state.ema(12), ema12[t])
+        assert_matches(state.ema(26), ema26[t])
+        for k, values in lags.items():
+            assert_matches(state.lag(k), values[t])
+        assert_matches(state.pct_change(), change[t])
+        if i < len(close):
+            state.push(close[i])
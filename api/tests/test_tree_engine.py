@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from assets import ASSETS, asset_path
+from boosters import load_booster
+from predictor import date_features
+
+@pytest.mark.parametrize('asset_id', list(ASSETS))
+@pytest.mark.parametrize('rows', [1, 64, 65])
+def test_flat_forest_matches_booster(asset_id, rows):
+    model = load_booster(asset_path(ASSETS[asset_id]['model']))
+    assert model.forest is not None
+    X = date_features(pd.date_range('2019-06-01', periods=rows, freq='37D'))
+    expected = model.booster.inplace_predict(X)
+    np.testing.assert_array_equal(model.forest.predict(X), expected)
+
+@pytest.mark.parametrize('asset_id', list(ASSETS))
+def test_flat_forest_follows_default_direction_on_missing(asset_id):
+    model = load_booster(asset_path(ASSETS[asset_id]['model']))
+    X = date_features(pd.date_range('2024-01-01', periods=65, freq='D')).astype('float32')
+    X.iloc[::3, 0] = np.nan
+    X.iloc[1::4, 2] = np.nan
+    np.testing.assert_array_equal(model.forest.predict(X), model.booster.inplace_predict(X))
@@ -1,23 +1,34 @@
 from flask import Flask, render_template, request
+import sys
+import numpy as np
 import pandas as pd
 from xgboost import XGBRegressor
 from datetime import timedelta
 
+from indicators import IndicatorState, ema, lag, pct_change, sma
+from artifacts import save_artifact, load_artifact
+from asgi_bridge import AsgiBridge
+
 app = Flask(__name__)
 
 # Load and preprocess historical data
-df = pd.read_csv('ethereum_last_1_year.csv')
+DATA_FILE = 'ethereum_last_1_year.csv'
+# Trained with 'python three.py train', loaded from models/eth_recursive/
+ARTIFACT = 'eth_recursive'
+
+df = pd.read_csv(DATA_FILE)
 df['Date'] = pd.to_datetime(df['Date'])
 
 # Feature Engineering
-df['Return'] = df['Close'].pct_change()
-df['Lag_1'] = df['Close'].shift(1)
-df['Lag_2'] = df['Close'].shift(2)
-df['Lag_3'] = df['Close'].shift(3)
-df['SMA_20'] = df['Close'].rolling(window=20).mean()
-df['SMA_50'] = df['Close'].rolling(window=50).mean()
-df['EMA_12'] = df['Close'].ewm(span=12, adjust=False).mean()
-df['EMA_26'] = df['Close'].ewm(span=26, adjust=False).mean()
+close = df['Close'].to_numpy(dtype='float64')
+df['Return'] = pct_change(close)
+df['Lag_1'] = lag(close, 1)
+df['Lag_2'] = lag(close, 2)
+df['Lag_3'] = lag(close, 3)
+df['SMA_20'] = sma(close, 20)
+df['SMA_50'] = sma(close, 50)
+df['EMA_12'] = ema(close, 12)
+df['EMA_26'] = ema(close, 26)
 df['SMA_diff'] = df['SMA_20'] - df['SMA_50']
 
 # Assume RSI and MACD are already present, otherwise forward-fill or mock
@@ -29,63 +40,69 @@ df.dropna(inplace=True)
 # Prepare model inputs
 features = ['SMA_20', 'SMA_50', 'RSI', 'MACD', 'EMA_12', 'EMA_26',
             'Return', 'Lag_1', 'Lag_2', 'Lag_3', 'SMA_diff']
-X = df[features]
-y = df['Close']
 
 # Train XGBoost model
-model = XGBRegressor(n_estimators=500, learning_rate=0.05, max_depth=5)
-model.fit(X, y)
+def train_model(df):
+    model = XGBRegressor(n_estimators=500, learning_rate=0.05, max_depth=5)
+    model.fit(df[features], df['Close'])
+    return model
+
+# The server only loads the latest trained artifact
+def load_model():
+    try:
+        model, metadata = load_artifact(ARTIFACT)
+        print(f"Loaded {ARTIFACT} model version {metadata['version']}")
+        return model
+    except FileNotFoundError:
+        print(f"Error: no trained {ARTIFACT} model, run 'python three.py train' first")
+        return None
+
+model = load_model()
+
+# Recursive forecast of every day up to target_date
+def forecast_path(df, model, target_date):
+    current_date = df['Date'].max()
+    horizon = (pd.to_datetime(target_date) - current_date).days
+
+    # Indicators of the last known row, updated in O(1) per predicted day
+    state = IndicatorState(df['Close'].to_numpy())
+
+    # Preallocated for the whole horizon, columns in the order of `features`
+    X_future = np.empty((horizon, len(features)))
+    closes = np.empty(horizon)
+    for i in range(horizon):
+        # Lags are taken relative to the last known row, as shift() did
+        X_future[i] = (
+            state.sma(20),
+            state.sma(50),
+            50,  # RSI placeholder
+            0,  # MACD placeholder
+            state.ema(12),
+            state.ema(26),
+            state.pct_change(),
+            state.lag(2),
+            state.lag(3),
+            state.lag(4),
+            state.sma(20) - state.sma(50)
+        )
+        closes[i] = model.predict(X_future[i:i + 1])[0]
+        state.push(closes[i])
+
+    path = pd.DataFrame(X_future, columns=features)
+    path.insert(0, 'Date', pd.date_range(current_date + timedelta(days=1), periods=horizon, freq='D'))
+    path['Close'] = closes
+    return path
 
 # Forecast function
 def forecast_future_date(df, model, target_date):
     target_date = pd.to_datetime(target_date)
-    last_known = df.copy()
-    current_date = last_known['Date'].max()
+    current_date = df['Date'].max()
 
     if target_date <= current_date:
         return f"❌ Date {target_date.date()} is already in the dataset."
 
-    while current_date < target_date:
-        # Recalculate indicators
-        last_known['Return'] = last_known['Close'].pct_change()
-        last_known['Lag_1'] = last_known['Close'].shift(1)
-        last_known['Lag_2'] = last_known['Close'].shift(2)
-        last_known['Lag_3'] = last_known['Close'].shift(3)
-        last_known['SMA_20'] = last_known['Close'].rolling(window=20).mean()
-        last_known['SMA_50'] = last_known['Close'].rolling(window=50).mean()
-        last_known['SMA_diff'] = last_known['SMA_20'] - last_known['SMA_50']
-        last_known['EMA_12'] = last_known['Close'].ewm(span=12, adjust=False).mean()
-        last_known['EMA_26'] = last_known['Close'].ewm(span=26, adjust=False).mean()
-        last_known['RSI'] = 50  # placeholder
-        last_known['MACD'] = 0  # placeholder
-
-        last_row = last_known.iloc[-1]
-        row = {
-            'SMA_20': last_row['SMA_20'],
-            'SMA_50': last_row['SMA_50'],
-            'RSI': last_row['RSI'],
-            'MACD': last_row['MACD'],
-            'EMA_12': last_row['EMA_12'],
-            'EMA_26': last_row['EMA_26'],
-            'Return': last_row['Return'],
-            'Lag_1': last_row['Lag_1'],
-            'Lag_2': last_row['Lag_2'],
-            'Lag_3': last_row['Lag_3'],
-            'SMA_diff': last_row['SMA_diff']
-        }
-
-        X_future = pd.DataFrame([row])
-        pred_close = model.predict(X_future)[0]
-
-        new_row = {
-            'Date': current_date + timedelta(days=1),
-            'Close': pred_close
-        }
-
-        last_known = pd.concat([last_known, pd.DataFrame([new_row])], ignore_index=True)
-        current_date += timedelta(days=1)
-
-    predicted_price = last_known[last_known['Date'] == target_date]['Close'].values[0]
+    path = forecast_path(df, model, target_date)
+    predicted_price = path[path['Date'] == target_date]['Close'].values[0]
     return f"🔮 Predicted Bitcoin Price on {target_date.date()}: ${predicted_price:.2f}"
 
 # Flask Route
@@ -100,5 +117,20 @@ def index():
             result = f"⚠️ Error: {str(e)}"
     return render_template('index.html', result=result)
 
+# Async serving: uvicorn three:asgi_app (see asgi_bridge.py). A recursive
+# forecast takes one model.predict per day, so they run in the CPU pool
+asgi_app = AsgiBridge(app, {'index': {'lane': 'cpu', 'limit': 2, 'queue': 16}})
+
 if __name__ == '__main__':
-    app.run(debug=True)
+    if sys.argv[1:] == ['train']:
+        version = save_artifact(ARTIFACT, train_model(df), {
+            'data': DATA_FILE,
+            'features': features,
+            'rows': len(df),
+            'last_date': df['Date'].max().strftime('%Y-%m-%d')
+        })
+        print(f"Saved {ARTIFACT} model version {version}")
+    elif model is not None:
+        app.run(debug=True)
+    else:
+        print("Failed to start server due to missing model")
@@ -0,0 +1,121 @@
+# Trains the date models of every asset in the registry in parallel.
+#
+#   python train.py [--workers N] [--n-jobs K] [--publish] [asset ...]
+#
+# Each asset is trained in its own process with at most K XGBoost threads,
+# so N * K stays within the machine's cores. Every model is saved as a new
+# versioned artifact in models/<asset>/ (see artifacts.py) and a summary of
+# RMSE and wall time per asset is printed and written to
+# models/train_summary.json. --publish also replaces the served
+# <asset>_model.ubj, which running servers then hot-reload.
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from sklearn.model_selection import train_test_split
+from xgboost import XGBRegressor
+
+from assets import ASSETS, asset_path
+from artifacts import MODELS_DIR, artifact_dir, new_version, save_artifact, write_atomic
+from predictor import date_features
+from price_store import current_version, read_columns
+
+# Same recipe binance.py used: 80/20 split, RMSE on the held-out part
+TRAIN_PARAMS = {'objective': 'reg:squarederror', 'n_estimators': 100}
+TEST_SIZE = 0.2
+RANDOM_STATE = 42
+
+def train_asset(asset_id, n_jobs=1):
+    start = time.perf_counter()
+    columns = read_columns(asset_id)
+    X = date_features(columns['Date'])
+    y = np.asarray(columns['Close'])
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE)
+
+    model = XGBRegressor(**TRAIN_PARAMS, n_jobs=n_jobs)
+    model.fit(X_train, y_train)
+    rmse = float(np.sqrt(np.mean((model.predict(X_test) - y_test) ** 2)))
+    seconds = time.perf_counter() - start
+
+    version = save_artifact(asset_id, model, {
+        'asset': asset_id,
+        'ticker': ASSETS[asset_id]['ticker'],
+        'features': list(X.columns),
+        'params': TRAIN_PARAMS,
+        'rows': len(y),
+        'store_version': current_version(asset_id),
+        'rmse': rmse,
+        'train_seconds': seconds,
+    })
+    return {'asset': asset_id, 'version': version, 'rows': len(y), 'rmse': rmse, 'seconds': seconds}
+
+def publish(asset_id, version):
+    # Copy the artifact over the served model file in one rename
+    target = asset_path(ASSETS[asset_id]['model'])
+    tmp = f"{target}.tmp-{os.getpid()}"
+    shutil.copyfile(os.path.join(artifact_dir(asset_id), f"{version}.ubj"), tmp)
+    os.replace(tmp, target)
+
+def train_all(asset_ids=None, workers=None, n_jobs=None):
+    asset_ids = list(asset_ids or ASSETS)
+    cpus = os.cpu_count() or 1
+    workers = workers or min(len(asset_ids), cpus)
+    n_jobs = n_jobs or max(1, cpus // workers)
+
+    start = time.perf_counter()
+    results = []
+    # spawn: fresh interpreters, so no OpenMP state is inherited through fork
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = {pool.submit(train_asset, asset_id, n_jobs): asset_id for asset_id in asset_ids}
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                print(f"Error training {futures[future]}: {str(e)}")
+                results.append({'asset': futures[future], 'error': str(e)})
+    results.sort(key=lambda r: asset_ids.index(r['asset']))
+    return {
+        'run': new_version(),
+        'workers': workers,
+        'n_jobs': n_jobs,
+        'wall_seconds': time.perf_counter() - start,
+        'assets': results,
+    }
+
+def print_summary(summary):
+    print(f"{'asset':<10} {'rows':>6} {'rmse':>14} {'seconds':>8}  version")
+    for r in summary['assets']:
+        if 'error' in r:
+            print(f"{r['asset']:<10} failed: {r['error']}")
+        else:
+            print(f"{r['asset']:<10} {r['rows']:>6} {r['rmse']:>14.6g} {r['seconds']:>8.2f}  {r['version']}")
+    total = sum(r.get('seconds', 0.0) for r in summary['assets'])
+    print(f"{len(summary['assets'])} assets in {summary['wall_seconds']:.2f}s wall "
+          f"({total:.2f}s of training, {summary['workers']} workers x {summary['n_jobs']} threads)")
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    options = {}
+    for flag in ('--workers', '--n-jobs'):
+        if flag in args:
+            i = args.index(flag)
+            options[flag] = int(args[i + 1])
+            del args[i:i + 2]
+    publish_models = '--publish' in args
+    args = [a for a in args if a != '--publish']
+
+    summary = train_all(args or None, options.get('--workers'), options.get('--n-jobs'))
+    print_summary(summary)
+    os.makedirs(MODELS_DIR, exist_ok=True)
+    write_atomic(os.path.join(MODELS_DIR, 'train_summary.json'), json.dumps(summary, indent=2).encode('utf-8'))
+    if publish_models:
+        for r in summary['assets']:
+            if 'error' not in r:
+                publish(r['asset'], r['version'])
+                print(f"Published {r['asset']} version {r['version']} to {ASSETS[r['asset']]['model']}")
@@ -59,13 +59,13 @@
 
 # root.mainloop()
 
-from flask import Flask, render_template, request
-import yfinance as yf
-import plotly.graph_objs as go
-from plotly.offline import plot
+from flask import Flask, Response, abort, render_template, request, send_file
+import importlib.util
 import os
 
-app = Flask(__name__)
+from asgi_bridge import AsgiBridge
+from chart_data import FixtureHistory, HistoryCache, YFinanceHistory
+from downsample import parse_width
 
 # Timeframes for the dropdown
 timeframes = {
@@ -76,43 +76,68 @@ timeframes = {
     "5 Months": ("5mo", "1d")
 }
 
-# Chart Generation Function
-def generate_chart(period, interval):
-    btc = yf.Ticker("BTC-USD")
-    data = btc.history(period=period, interval=interval)
-    data.reset_index(inplace=True)
-
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=data['Datetime'] if 'Datetime' in data else data['Date'],
-        y=data['Close'],
-        mode='lines+markers',
-        name='Close Price',
-        line=dict(color='orange')
-    ))
-
-    fig.update_layout(
-        title=f"📈 Bitcoin Price - {period} / {interval}",
-        xaxis_title="Time",
-        yaxis_title="Price (USD)",
-        xaxis_rangeslider_visible=True,
-        template="plotly_dark"
-    )
-
-    # Save chart as HTML snippet
-    chart_html = plot(fig, output_type='div', include_plotlyjs=True)
-    return chart_html
-
-# Home Route
-@app.route('/', methods=['GET', 'POST'])
-def index():
-    chart_html = ""
-    selected_option = ""
-    if request.method == 'POST':
-        selected_option = request.form['timeframe']
-        period, interval = timeframes[selected_option]
-        chart_html = generate_chart(period, interval)
-    return render_template('chart.html', chart=chart_html, options=list(timeframes.keys()), selected=selected_option)
+TICKER = "BTC-USD"
+# Used when the plotly package (which bundles plotly.js) isn't installed
+PLOTLY_CDN = "https://cdn.plot.ly/plotly-2.35.2.min.js"
+# plotly.js never changes for a given package version
+PLOTLY_MAX_AGE = 365 * 24 * 3600
+
+def plotly_js_path():
+    spec = importlib.util.find_spec('plotly')
+    if spec is None:
+        return None
+    path = os.path.join(os.path.dirname(spec.origin), 'package_data', 'plotly.min.js')
+    return path if os.path.exists(path) else None
+
+def create_app(source=None):
+    # source: anything with fetch(ticker, period, interval), e.g. FixtureHistory()
+    if source is None:
+        source = FixtureHistory() if os.environ.get('CHART_SOURCE') == 'fixture' else YFinanceHistory()
+    app = Flask(__name__)
+    cache = HistoryCache(source)
+    plotly_js = plotly_js_path()
+
+    # Home Route
+    @app.route('/', methods=['GET', 'POST'])
+    def index():
+        selected_option = request.form.get('timeframe', "") if request.method == 'POST' else ""
+        return render_template('chart.html', options=list(timeframes.keys()), timeframes=timeframes,
+                               selected=selected_option, plotly_src='/assets/plotly.min.js' if plotly_js else PLOTLY_CDN)
+
+    # Chart data as compact JSON; the page draws it with plotly.js
+    @app.route('/chart-data')
+    def chart_data():
+        option = request.args.get('timeframe', "")
+        if option not in timeframes:
+            abort(404)
+        period, interval = timeframes[option]
+        # Downsampled to the chart's pixel width when the page sends it
+        try:
+            width = parse_width(request.args.get('width'))
+        except ValueError:
+            abort(400)
+        method = 'minmax' if request.args.get('method') == 'minmax' else 'lttb'
+        payload, max_age = cache.get(TICKER, period, interval, width, method)
+        response = Response(payload, mimetype='application/json')
+        response.headers['Cache-Control'] = f"public, max-age={max_age}"
+        return response
+
+    @app.route('/assets/plotly.min.js')
+    def plotly_bundle():
+        if plotly_js is None:
+            abort(404)
+        return send_file(plotly_js, mimetype='application/javascript', max_age=PLOTLY_MAX_AGE)
+
+    return app
+
+app = create_app()
+# Async serving: uvicorn two:asgi_app (see asgi_bridge.py). Chart data may
+# have to be fetched from Yahoo, so it waits in the I/O pool
+asgi_app = AsgiBridge(app, {
+    'index': {'lane': 'loop'},
+    'chart_data': {'lane': 'io', 'limit': 8, 'queue': 32},
+    'plotly_bundle': {'lane': 'io'},
+})
 
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,12 @@
+# Production entry point: gunicorn -c gunicorn.conf.py wsgi:app
+# The config preloads this module in the master process, so every model and
+# dataset is loaded once before the workers are forked and shared copy-on-write.
+import gc
+
+from server import create_app
+
+app = create_app()
+
+# Move everything loaded so far out of the collector's reach so that GC passes
+# in the workers don't touch (and thereby copy) the shared pages
+gc.freeze()
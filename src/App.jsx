@@ -26,6 +26,17 @@ ChartJS.register(
   zoomPlugin
 );
 
+// Single multi-asset prediction server (api/server.py)
+const API_URL = 'http://localhost:5480';
+// Columnar responses carry dates as days since 1970-01-01 (see api/encoding.py)
+const COLUMNS_JSON = 'application/vnd.crypto-columns+json';
+const MS_PER_DAY = 86400000;
+
+const fromColumns = ({ days, prices }) => ({
+  dates: days.map(day => new Date(day * MS_PER_DAY).toISOString().slice(0, 10)),
+  prices
+});
+
 const App = () => {
   const [selectedCrypto, setSelectedCrypto] = useState('bitcoin');
   const [timeframe, setTimeframe] = useState('7d');
@@ -39,14 +50,15 @@ const App = () => {
   const chartRef = useRef(null);
 
   const cryptos = [
-    { id: 'bitcoin', name: 'Bitcoin (BTC)', symbol: 'BTC', port: 5474 },
-    { id: 'ethereum', name: 'Ethereum (ETH)', symbol: 'ETH', port: 5475 },
-    { id: 'solana', name: 'Solana (SOL)', symbol: 'SOL', port: 5472 },
-    { id: 'doge', name: 'Dogecoin (DOGE)', symbol: 'DOGE', port: 5470 },
-    { id: 'shiba', name: 'Shiba Inu (SHIB)', symbol: 'SHIB', port: 5471 },
-    { id: 'tone', name: 'Tone (TON)', symbol: 'TON', port: 5473 },
-    { id: 'usdt', name: 'Tether (USDT)', symbol: 'USDT', port: 5476 },
-    { id: 'xrp', name: 'XRP (XRP)', symbol: 'XRP', port: 5477 }
+    { id: 'bitcoin', name: 'Bitcoin (BTC)', symbol: 'BTC' },
+    { id: 'ethereum', name: 'Ethereum (ETH)', symbol: 'ETH' },
+    { id: 'solana', name: 'Solana (SOL)', symbol: 'SOL' },
+    { id: 'doge', name: 'Dogecoin (DOGE)', symbol: 'DOGE' },
+    { id: 'shiba', name: 'Shiba Inu (SHIB)', symbol: 'SHIB' },
+    { id: 'tone', name: 'Tone (TON)', symbol: 'TON' },
+    { id: 'usdt', name: 'Tether (USDT)', symbol: 'USDT' },
+    { id: 'xrp', name: 'XRP (XRP)', symbol: 'XRP' },
+    { id: 'bnb', name: 'BNB (BNB)', symbol: 'BNB' }
 
   ];
 
@@ -83,16 +95,17 @@ const App = () => {
     setIsLoading(true);
     setError(null);
     try {
-      // Find the selected crypto to get the correct port
+      // Find the selected crypto to send its id to the server
       const selectedCryptoData = cryptos.find(c => c.id === selectedCrypto);
       if (!selectedCryptoData) {
         throw new Error('Selected cryptocurrency not found');
       }
 
-      const response = await fetch(`http://localhost:${selectedCryptoData.port}/predict`, {
+      const response = await fetch(`${API_URL}/predict`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          'Accept': `${COLUMNS_JSON}, application/json;q=0.9`,
         },
         body: JSON.stringify({
           crypto: selectedCryptoData.id,
@@ -105,6 +118,10 @@ const App = () => {
       if (!data.success) {
         throw new Error(data.error || 'Prediction failed');
       }
+      if (response.headers.get('Content-Type')?.startsWith(COLUMNS_JSON)) {
+        const { historical, predictions } = data.result.chart_data;
+        data.result.chart_data = { historical: fromColumns(historical), predictions: fromColumns(predictions) };
+      }
 
       setPredictionData(data);
     } catch (err) {